@@ -0,0 +1,287 @@
+"""
+Module for managing the download of Selenium webdriver binaries from asyncio code.
+
+This code is released under the MIT license.
+"""
+import asyncio
+import functools
+import hashlib
+import logging
+import os
+import os.path
+import time
+try:
+    from urlparse import urlparse  # Python 2.x import
+except ImportError:
+    from urllib.parse import urlparse  # Python 3.x import
+
+import aiohttp
+
+from .testWebDriverDownloaderBase import WebDriverDownloaderBase, _FileLock
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWebDriverDownloaderBase(WebDriverDownloaderBase):
+    """Abstract Base Class for web driver downloaders used from an asyncio event loop.
+
+    download() and download_and_install() are coroutines.  Transfers use a shared aiohttp.ClientSession, file writes
+    and extraction run in an executor, so many installs and version checks can share one event loop.  Subclasses
+    implement the same abstract methods as for WebDriverDownloaderBase.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initializer for the class.  Accepts the parameters of WebDriverDownloaderBase and three optional keyword
+        parameters.
+
+        :param http_session: aiohttp.ClientSession used for every HTTP request made from the event loop.  If not
+                             specified, one is created on first use and closed by close().
+        :param connection_limit: Maximum number of simultaneous connections of the default aiohttp session
+                                 (default=100).
+        :param executor: concurrent.futures.Executor used for file writes, extraction and blocking calls.  If not
+                         specified, the default executor of the event loop is used.
+        """
+        self.http_session = kwargs.pop("http_session", None)
+        self.connection_limit = kwargs.pop("connection_limit", 100)
+        self.executor = kwargs.pop("executor", None)
+        super(AsyncWebDriverDownloaderBase, self).__init__(*args, **kwargs)
+        self._owns_http_session = self.http_session is None
+        self._download_locks = {}
+        self._revalidation_tasks = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """
+        Method for closing the aiohttp session, if it was created by the downloader.
+        """
+        if self._owns_http_session and self.http_session is not None:
+            await self.http_session.close()
+            self.http_session = None
+
+    def _get_http_session(self):
+        """
+        Method for getting the aiohttp session, creating it in the running event loop if needed.
+
+        :returns: The aiohttp.ClientSession.
+        """
+        if self.http_session is None:
+            self.http_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.connection_limit))
+        return self.http_session
+
+    async def _run_in_executor(self, func, *args, **kwargs):
+        """
+        Method for running a blocking callable in the executor.
+
+        :returns: The return value of the callable.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def resolve_download_url(self, version="latest", os_name=None, bitness=None):
+        """
+        Method for getting the source download URL for a web driver binary without blocking the event loop.  Runs
+        get_download_url() in the executor; subclasses can override it with a native implementation, e.g. using
+        get_latest_version_async().
+
+        :param version: String representing the version of the web driver binary to download.  For example, "2.38".
+                        Default if no version is specified is "latest".
+        :param os_name: Name of the OS to download the web driver binary for, as a str.  If not specified, we will use
+                        platform.system() to get the OS.
+        :param bitness: Bitness of the web driver binary to download, as a str e.g. "32", "64".  If not specified, we
+                        will try to guess the bitness by using util.get_architecture_bitness().
+        :returns: The source download URL for the web driver binary.
+        """
+        return await self._run_in_executor(self.get_download_url, version, os_name=os_name, bitness=bitness)
+
+    async def get_latest_version_async(self, latest_url):
+        """
+        Coroutine counterpart of get_latest_version(), sharing its on-disk cache.  A fresh cache entry is returned
+        without leaving the event loop; revalidation uses the aiohttp session, and within stale_while_revalidate it
+        runs as a background task.
+
+        :param latest_url: URL of the endpoint returning the latest version.
+        :returns: The latest version, as a str.
+        """
+        entry_filename, entry = self._read_latest_entry(latest_url)
+        if entry is not None:
+            age = time.time() - entry["fetched_at"]
+            if age < self.latest_ttl:
+                return entry["version"]
+            if age < self.latest_ttl + self.stale_while_revalidate:
+                if latest_url not in self._revalidation_tasks:
+                    task = asyncio.ensure_future(self._revalidate_latest_version_async(latest_url, entry_filename,
+                                                                                       entry))
+                    self._revalidation_tasks[latest_url] = task
+                    task.add_done_callback(lambda _: self._revalidation_tasks.pop(latest_url, None))
+                return entry["version"]
+        return await self._revalidate_latest_version_async(latest_url, entry_filename, entry)
+
+    async def _revalidate_latest_version_async(self, latest_url, entry_filename, entry=None):
+        """
+        Coroutine fetching or revalidating the latest version and storing it in the on-disk cache.
+
+        :param latest_url: URL of the endpoint returning the latest version.
+        :param entry_filename: The path + filename of the cache entry.
+        :param entry: The current cache entry, or None.
+        :returns: The latest version, as a str.
+        """
+        try:
+            async with self._get_http_session().get(latest_url,
+                                                    headers=self._get_revalidation_headers(entry)) as response:
+                text = await response.text()
+                status_code, headers = response.status, response.headers
+        except aiohttp.ClientError as exc:
+            if entry is None:
+                raise
+            logger.warning("Could not revalidate {0}, using cached version {1}: {2}".format(
+                latest_url, entry["version"], exc))
+            return entry["version"]
+        return await self._run_in_executor(self._store_latest_entry, latest_url, entry_filename, entry, status_code,
+                                           text, headers)
+
+    async def download(self, version="latest", os_name=None, bitness=None, expected_sha256=None):
+        """
+        Coroutine for downloading a web driver binary.  Skips the download if the file is already present locally and
+        matches expected_sha256, or its saved digest; a corrupt file is downloaded again.  Concurrent downloads of the same file, in this event loop or in other processes, wait for the first one
+        and reuse its file.
+
+        :param version: String representing the version of the web driver binary to download.  For example, "2.38".
+                        Default if no version is specified is "latest".
+        :param os_name: Name of the OS to download the web driver binary for, as a str.  If not specified, we will use
+                        platform.system() to get the OS.
+        :param bitness: Bitness of the web driver binary to download, as a str e.g. "32", "64".  If not specified, we
+                        will try to guess the bitness by using util.get_architecture_bitness().
+        :param expected_sha256: Expected SHA-256 hex digest of the file.  A mismatch raises a RuntimeError.
+        :returns: The path + filename to the downloaded web driver binary.
+        """
+        filename_with_path, _ = await self._download(version, os_name=os_name, bitness=bitness,
+                                                     expected_sha256=expected_sha256)
+        return filename_with_path
+
+    async def _download(self, version="latest", os_name=None, bitness=None, expected_sha256=None, download_url=None):
+        """
+        Coroutine doing the work of download(), see there for the parameters.
+
+        :param download_url: The download URL already resolved by the caller.  If not specified, it is resolved with
+                             resolve_download_url().
+        :returns: Tuple of [0] the path + filename to the downloaded web driver binary and [1] a boolean indicating if
+                  this call fetched it.  Either way its digest was verified.
+        """
+        fetched = False
+        if download_url is None:
+            download_url = await self.resolve_download_url(version, os_name=os_name, bitness=bitness)
+        filename = os.path.split(urlparse(download_url).path)[1]
+        filename_with_path = os.path.join(self.get_download_path(version), filename)
+        if os.path.isfile(filename_with_path) and await self._run_in_executor(self._is_file_intact, filename_with_path,
+                                                                              expected_sha256, True):
+            logger.info("Skipping download. File {0} already on filesystem.".format(filename_with_path))
+            return filename_with_path, fetched
+        lock = self._download_locks.setdefault(filename_with_path, asyncio.Lock())
+        async with lock:
+            if not os.path.isdir(self.get_download_path(version)):
+                await self._run_in_executor(os.makedirs, self.get_download_path(version), exist_ok=True)
+            file_lock = _FileLock(filename_with_path + ".lock")
+            await self._run_in_executor(file_lock.__enter__)
+            try:
+                if os.path.isfile(filename_with_path) and await self._run_in_executor(
+                        self._is_file_intact, filename_with_path, expected_sha256, True):
+                    logger.info("Skipping download. File {0} was downloaded by another installer.".format(
+                        filename_with_path))
+                else:
+                    if os.path.isfile(filename_with_path):
+                        logger.warning("File {0} is corrupt and will be downloaded again.".format(filename_with_path))
+                        await self._run_in_executor(os.remove, filename_with_path)
+                    await self._fetch(download_url, filename_with_path, expected_sha256)
+                    fetched = True
+            finally:
+                await self._run_in_executor(file_lock.__exit__, None, None, None)
+        self._download_locks.pop(filename_with_path, None)
+        return filename_with_path, fetched
+
+    async def _fetch(self, download_url, filename_with_path, expected_sha256=None):
+        """
+        Coroutine streaming a file to a ".part" file that is renamed once complete.  The response is hashed as it
+        arrives and written in batches of about a megabyte in the executor.
+
+        :param download_url: The source download URL for the web driver binary.
+        :param filename_with_path: The path + filename the file will be written to.
+        :param expected_sha256: Expected SHA-256 hex digest of the file, or None.
+        """
+        part_filename = filename_with_path + ".part"
+        sha256 = hashlib.sha256()
+        logger.debug("Starting download of {0} to {1}".format(download_url, filename_with_path))
+        async with self._get_http_session().get(download_url) as response:
+            if response.status != 200:
+                filename = os.path.split(urlparse(download_url).path)[1]
+                error_message = "Error downloading file {0}, got status code: {1}".format(filename, response.status)
+                logger.error(error_message)
+                raise RuntimeError(error_message)
+            fileobj = await self._run_in_executor(open, part_filename, "wb")
+            try:
+                buffer = bytearray()
+                async for chunk in response.content.iter_chunked(256 * 1024):
+                    sha256.update(chunk)
+                    buffer += chunk
+                    if len(buffer) >= 1024 * 1024:
+                        pending, buffer = buffer, bytearray()
+                        await self._run_in_executor(fileobj.write, pending)
+                if buffer:
+                    await self._run_in_executor(fileobj.write, buffer)
+            except BaseException:
+                await self._run_in_executor(fileobj.close)
+                await self._run_in_executor(os.remove, part_filename)
+                raise
+            await self._run_in_executor(fileobj.close)
+        if expected_sha256 is not None and sha256.hexdigest() != expected_sha256.lower():
+            await self._run_in_executor(os.remove, part_filename)
+            error_message = "Checksum mismatch for {0}: expected {1}, got {2}".format(download_url, expected_sha256,
+                                                                                     sha256.hexdigest())
+            logger.error(error_message)
+            raise RuntimeError(error_message)
+        await self._run_in_executor(self._write_file_digest, filename_with_path, sha256.hexdigest())
+        await self._run_in_executor(os.replace, part_filename, filename_with_path)
+        logger.debug("Finished downloading {0} to {1}".format(download_url, filename_with_path))
+
+    async def download_and_install(self, version="latest", os_name=None, bitness=None, expected_sha256=None,
+                                   **kwargs):
+        """
+        Coroutine for downloading a web driver binary, extracting it and linking it like
+        WebDriverDownloaderBase.download_and_install().  The download URL is resolved once.  A binary known to the
+        driver cache or to the install manifest is linked without downloading; otherwise the download runs on the
+        event loop, and extraction and linking run in the executor on the downloaded archive, which was verified
+        while it was fetched or reused and is not hashed again.
+
+        :param version: String representing the version of the web driver binary to download.  For example, "2.38".
+                        Default if no version is specified is "latest".
+        :param os_name: Name of the OS to download the web driver binary for, as a str.  If not specified, we will use
+                        platform.system() to get the OS.
+        :param bitness: Bitness of the web driver binary to download, as a str e.g. "32", "64".  If not specified, we
+                        will try to guess the bitness by using util.get_architecture_bitness().
+        :param expected_sha256: Expected SHA-256 hex digest of the archive.
+        :param kwargs: Additional keyword arguments for WebDriverDownloaderBase.download_and_install(), e.g.
+                       extract_driver_only.  stream_extract is not supported.
+        :returns: Tuple containing the path + filename to [0] the extracted binary, and [1] the symlink to the
+                  extracted binary.
+        """
+        download_url = await self.resolve_download_url(version, os_name=os_name, bitness=bitness)
+        kwargs["show_progress_bar"] = False
+        kwargs["stream_extract"] = False
+        if not await self._run_in_executor(self._is_installable_offline, version, download_url, os_name=os_name):
+            await self._download(version, os_name=os_name, bitness=bitness, expected_sha256=expected_sha256,
+                                 download_url=download_url)
+            kwargs["verify_archive"] = False
+
+        def install():
+            with self._metrics_scope("download_and_install", version):
+                actual_driver_filename = self._extract_driver(version, os_name=os_name, bitness=bitness,
+                                                              download_url=download_url, **kwargs)
+                return self._link_driver(actual_driver_filename, os_name=os_name)
+
+        return await self._run_in_executor(install)
@@ -0,0 +1,83 @@
+"""
+Import-time benchmark for the downloader module, guarding the cold-start budget of short-lived robot processes.
+
+Imports the module in a fresh interpreter with "python -X importtime", checks that none of the lazily loaded
+dependencies were imported and that the cumulative import time stays within the budget.  Exits with status 1 when the
+budget is exceeded.  Run it as a module from the package root, e.g.:
+
+    python -m webdriverdownloader.benchImportTime --budget-ms 30 --runs 5
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+LAZY_MODULES = ["aiohttp", "bs4", "requests", "tarfile", "tqdm", "urllib3", "zipfile"]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure(module):
+    """
+    Imports a module in a new interpreter with -X importtime.
+
+    :param module: Dotted name of the module.
+    :returns: Tuple containing [0] the cumulative import time of the module in microseconds, and [1] a dict of every
+              module imported by it to its cumulative import time in microseconds.
+    """
+    env = dict(os.environ)
+    # Measure a warm start from cached bytecode, as on the robot hosts.
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import {0}".format(module)],
+                               stderr=subprocess.PIPE, universal_newlines=True, check=True, env=env)
+    subtree = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        name, cumulative = match.group(4), int(match.group(2))
+        if len(match.group(3)) > 1:
+            # Nested imports are listed before the top-level import that triggered them.
+            subtree[name] = cumulative
+        elif name == module:
+            return cumulative, subtree
+        else:
+            subtree = {}
+    raise RuntimeError("{0} was already imported during interpreter start-up".format(module))
+
+
+def main():
+    default_module = "{0}.testWebDriverDownloaderBase".format(__package__) if __package__ else \
+        "testWebDriverDownloaderBase"
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default=default_module)
+    parser.add_argument("--budget-ms", type=float, default=30.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    measure(args.module)
+    timings = []
+    for _ in range(args.runs):
+        cumulative, imported = measure(args.module)
+        timings.append(cumulative)
+    best_ms = min(timings) / 1000.0
+    eager = [name for name in LAZY_MODULES if name in imported]
+    slowest = sorted(imported.items(), key=lambda item: item[1], reverse=True)[:10]
+    print("{0}: best {1:.1f} ms over {2} runs (budget {3:.1f} ms)".format(args.module, best_ms, args.runs,
+                                                                          args.budget_ms))
+    for name, cumulative in slowest:
+        print("  {0:8.1f} ms  {1}".format(cumulative / 1000.0, name))
+    failures = []
+    if eager:
+        failures.append("imported eagerly: {0}".format(", ".join(eager)))
+    if best_ms > args.budget_ms:
+        failures.append("over budget by {0:.1f} ms".format(best_ms - args.budget_ms))
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
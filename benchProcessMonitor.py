@@ -0,0 +1,61 @@
+"""
+Cost per sample of counting msedge.exe processes: full psutil scan (countProcess.py before) versus ProcessMonitor.
+
+Extra idle processes can be started to grow the process table, e.g.:
+
+    python benchProcessMonitor.py --extra 300 --samples 50 --churn 5
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+import psutil
+
+from processMonitor import ProcessMonitor
+
+
+def fullScan(name):
+    procesos = psutil.process_iter(attrs=['name'])
+    return len([p for p in procesos if p.info['name'] == name])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--extra", type=int, default=300, help="Idle processes added to the process table")
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--churn", type=int, default=5, help="Processes replaced between two samples")
+    parser.add_argument("--name", default="msedge.exe")
+    args = parser.parse_args()
+
+    sleeper = [sys.executable, "-c", "import time; time.sleep(600)"]
+    extra = [subprocess.Popen(sleeper) for _ in range(args.extra)]
+    try:
+        time.sleep(1)
+        monitor = ProcessMonitor(watch=[args.name])
+        monitor.refresh()
+        timings = {"full scan": 0.0, "monitor": 0.0}
+        for _ in range(args.samples):
+            for _ in range(min(args.churn, len(extra))):
+                process = extra.pop(0)
+                process.kill()
+                process.wait()
+                extra.append(subprocess.Popen(sleeper))
+            start = time.perf_counter()
+            expected = fullScan(args.name)
+            timings["full scan"] += time.perf_counter() - start
+            start = time.perf_counter()
+            monitor.refresh()
+            timings["monitor"] += time.perf_counter() - start
+            assert monitor.count(args.name) == expected, "Monitor count differs from the full scan"
+        print("{0} processes, {1} replaced per sample".format(len(psutil.pids()), args.churn))
+        for method, total in timings.items():
+            print("{0:<10} {1:10.1f} us/sample".format(method, total / args.samples * 1e6))
+    finally:
+        for process in extra:
+            process.kill()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Throughput of robot invocations carrying batches of queue IDs, using stubRobot.py with a configurable start-up cost.
+
+Each batch size is run twice: with the queue items in an argument file and on stdin, e.g.:
+
+    python benchRocketBatching.py --items 200 --workers 4 --batch-sizes 1 5 10 25 --startup 0.2 --work 0.02
+"""
+import argparse
+import os.path
+import sys
+import tempfile
+import time
+
+from rocketBatch import BatchScheduler
+
+
+STUB_ROBOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stubRobot.py")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 5, 10, 25])
+    parser.add_argument("--startup", type=float, default=0.2, help="Start-up cost of the stub robot in seconds")
+    parser.add_argument("--work", type=float, default=0.02, help="Duration of one queue item in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        knobs = ["-startup={0}".format(args.startup), "-work={0}".format(args.work),
+                 "-log=" + os.path.join(tmp, "stub.log")]
+        commands = (("file", [sys.executable, STUB_ROBOT, "-queues={batch}"] + knobs),
+                    ("stdin", [sys.executable, STUB_ROBOT, "-serve=1"] + knobs))
+        print("{0} items on {1} workers, startup={2} s, work={3} s".format(args.items, args.workers, args.startup,
+                                                                         args.work))
+        print("{0:>6} {1:>10} {2:>10}".format("batch", "file/s", "stdin/s"))
+        for batch_size in args.batch_sizes:
+            rates = []
+            for _, command in commands:
+                scheduler = BatchScheduler(command, max_items=batch_size, max_concurrency=args.workers)
+                start = time.perf_counter()
+                results = list(scheduler.run({"id": queue_id} for queue_id in range(args.items)))
+                elapsed = time.perf_counter() - start
+                assert len(results) == args.items and all(result.returncode == 0 for result in results), \
+                    "A stub robot run failed"
+                rates.append(args.items / elapsed)
+            print("{0:>6} {1:10.1f} {2:10.1f}".format(batch_size, *rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Simulated makespan of a robot batch in FIFO order versus longest-expected-first order.
+
+Queue durations are drawn from a heavy-tailed distribution; the history only knows them with some noise and misses a
+fraction of the queue IDs entirely, as happens with new queues.  Each batch is list-scheduled on N robots, e.g.:
+
+    python benchRocketScheduling.py --queues 200 --workers 5 --trials 50 --noise 0.3
+"""
+import argparse
+import heapq
+import random
+import statistics
+
+from rocketHistory import DurationHistory, orderLongestFirst
+
+
+def simulateMakespan(durations, workers):
+    """
+    Simulates list scheduling: every item starts on the first robot that becomes free.
+
+    :param durations: Durations in seconds, in dispatch order.
+    :param workers: Number of concurrent robots.
+    :returns: The time at which the last item finishes.
+    """
+    free_at = [0.0] * workers
+    for duration in durations:
+        heapq.heappush(free_at, heapq.heappop(free_at) + duration)
+    return max(free_at)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queues", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=5)
+    parser.add_argument("--trials", type=int, default=50)
+    parser.add_argument("--noise", type=float, default=0.3, help="Relative error of the recorded durations")
+    parser.add_argument("--unseen", type=float, default=0.1, help="Fraction of queue IDs missing from the history")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ratios = {"fifo": [], "lpt": []}
+    for _ in range(args.trials):
+        items = [{"id": queue_id} for queue_id in range(args.queues)]
+        actual = {item["id"]: rng.lognormvariate(0, 1.2) * 10 for item in items}
+        history = DurationHistory()
+        for queue_id, duration in actual.items():
+            if rng.random() >= args.unseen:
+                history.record(queue_id, duration * max(0.0, rng.gauss(1, args.noise)))
+        lower_bound = max(sum(actual.values()) / args.workers, max(actual.values()))
+        for policy, order in (("fifo", items), ("lpt", orderLongestFirst(items, history))):
+            makespan = simulateMakespan([actual[item["id"]] for item in order], args.workers)
+            ratios[policy].append(makespan / lower_bound)
+
+    print("{0} queues on {1} robots, {2} trials, noise={3}, unseen={4}".format(args.queues, args.workers,
+                                                                               args.trials, args.noise, args.unseen))
+    print("{0:<6} {1:>10} {2:>10}".format("policy", "mean", "worst"))
+    for policy, values in ratios.items():
+        print("{0:<6} {1:10.3f} {2:10.3f}".format(policy, statistics.mean(values), max(values)))
+    print("(makespan / lower bound; 1.000 is optimal)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Throughput of one-shot robot launches versus a warm pool, using stubRobot.py with a configurable start-up cost.
+
+Every queue item runs the same short bot body; only the start-up paid per item (one-shot) or per worker (warm pool)
+differs, e.g.:
+
+    python benchRocketWarmPool.py --items 100 --workers 4 --startup 0 0.2 0.5 --work 0.02
+"""
+import argparse
+import os.path
+import sys
+import tempfile
+import time
+
+from rocketScheduler import RobotScheduler
+from rocketWarmPool import WarmPool
+
+
+STUB_ROBOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stubRobot.py")
+
+
+def measure(scheduler, items):
+    start = time.perf_counter()
+    results = list(scheduler.run({"id": queue_id} for queue_id in range(items)))
+    elapsed = time.perf_counter() - start
+    assert all(result.returncode == 0 for result in results), "A stub robot run failed"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--startup", type=float, nargs="+", default=[0.0, 0.2, 0.5],
+                        help="Start-up cost of the stub robot in seconds")
+    parser.add_argument("--work", type=float, default=0.02, help="Duration of the bot body in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, "stub.log")
+        print("{0} items on {1} workers, work={2} s".format(args.items, args.workers, args.work))
+        print("{0:>8} {1:>12} {2:>12} {3:>8}".format("startup", "one-shot/s", "warm/s", "speedup"))
+        for startup in args.startup:
+            knobs = ["-startup={0}".format(startup), "-work={0}".format(args.work), "-log=" + log]
+            one_shot = RobotScheduler([sys.executable, STUB_ROBOT, "-queue={id}"] + knobs,
+                                      max_concurrency=args.workers)
+            cold = measure(one_shot, args.items)
+            with WarmPool([sys.executable, STUB_ROBOT, "-serve=1"] + knobs, max_concurrency=args.workers) as pool:
+                warm = measure(pool, args.items)
+                assert pool.fallbacks == 0, "Warm workers fell back to one-shot launches"
+            print("{0:8.2f} {1:12.1f} {2:12.1f} {3:7.1f}x".format(startup, args.items / cold, args.items / warm,
+                                                                   cold / warm))
+
+
+if __name__ == "__main__":
+    main()
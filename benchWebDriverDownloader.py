@@ -0,0 +1,135 @@
+"""
+Benchmark for WebDriverDownloaderBase.download against a local HTTP server.
+
+The server serves a random payload, honours HTTP Range requests and throttles every connection to a fixed bandwidth,
+which is how the CDN behaves for a single stream.  Run it as a module from the package root, e.g.:
+
+    python -m webdriverdownloader.benchWebDriverDownloader --size-mb 16 --connections 1 4 8
+"""
+import argparse
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import re
+import tempfile
+import threading
+import time
+
+from .testWebDriverDownloaderBase import WebDriverDownloaderBase
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serves ``server.payload`` at any path, supporting single byte ranges and If-None-Match."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_payload(self, send_body):
+        payload = self.server.payload
+        self.server.requests_served += 1
+        if self.headers.get("If-None-Match") == self.server.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.server.etag)
+            self.end_headers()
+            return
+        start, end = 0, len(payload) - 1
+        status = 200
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and self.server.accept_ranges and if_range in (None, self.server.etag):
+            match = re.match(r"bytes=(\d+)-(\d*)", range_header)
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+            status = 206
+        self.send_response(status)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", self.server.etag)
+        if self.server.accept_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", "bytes {0}-{1}/{2}".format(start, end, len(payload)))
+        self.end_headers()
+        if not send_body:
+            return
+        view = memoryview(payload)[start:end + 1]
+        chunk_size = 64 * 1024
+        delay = chunk_size / self.server.bytes_per_second if self.server.bytes_per_second else 0
+        for offset in range(0, len(view), chunk_size):
+            self.wfile.write(view[offset:offset + chunk_size])
+            if delay:
+                time.sleep(delay)
+
+    def do_HEAD(self):
+        self._send_payload(send_body=False)
+
+    def do_GET(self):
+        self._send_payload(send_body=True)
+
+
+def serve(payload, bytes_per_second=0, accept_ranges=True):
+    """
+    Starts a local HTTP server in a daemon thread.
+
+    :param payload: Bytes served for every path.
+    :param bytes_per_second: Bandwidth limit per connection, 0 for unlimited.
+    :param accept_ranges: Boolean indicating if the server advertises and honours range requests.
+    :returns: The running server; ``server.server_address`` holds the bound host and port.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+    server.daemon_threads = True
+    server.payload = payload
+    server.etag = '"{0}"'.format(hashlib.sha256(payload).hexdigest()[:16])
+    server.bytes_per_second = bytes_per_second
+    server.accept_ranges = accept_ranges
+    server.requests_served = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class LocalDownloader(WebDriverDownloaderBase):
+    """Downloader pointing at the local benchmark server."""
+
+    def __init__(self, base_url, **kwargs):
+        self.base_url = base_url
+        super(LocalDownloader, self).__init__(**kwargs)
+
+    def get_driver_filename(self, os_name=None):
+        return "msedgedriver"
+
+    def get_download_path(self, version="latest"):
+        return os.path.join(self.download_root, version)
+
+    def get_download_url(self, version="latest", os_name=None, bitness=None):
+        return "{0}/{1}/edgedriver_linux64.zip".format(self.base_url, version)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=16)
+    parser.add_argument("--rate-mb", type=float, default=8.0, help="Per-connection bandwidth limit in MB/s")
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    payload = os.urandom(args.size_mb * 1024 * 1024)
+    server = serve(payload, bytes_per_second=int(args.rate_mb * 1024 * 1024))
+    base_url = "http://{0}:{1}".format(*server.server_address)
+    with tempfile.TemporaryDirectory() as tmp:
+        downloader = LocalDownloader(base_url, download_root=os.path.join(tmp, "webdriver"),
+                                     link_path=os.path.join(tmp, "bin"))
+        for connections in args.connections:
+            version = "c{0}".format(connections)
+            start = time.perf_counter()
+            path = downloader.download(version, show_progress_bar=False, connections=connections)
+            elapsed = time.perf_counter() - start
+            with open(path, "rb") as fileobj:
+                assert fileobj.read() == payload, "Downloaded file does not match the payload"
+            print("connections={0:<3} {1:8.3f} s {2:8.2f} MB/s".format(connections, elapsed,
+                                                                        args.size_mb / elapsed))
+        print("session: {0}".format(downloader.get_connection_stats()))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,17 @@
-import psutil
 import sys
+import time
 
-procesos = psutil.process_iter(attrs=['name'])
-procesos_edge = [p for p in procesos if p.info['name'] == 'msedge.exe']
+from processMonitor import ProcessMonitor
 
-print(len(procesos_edge))
\ No newline at end of file
+nombre = sys.argv[1] if len(sys.argv) > 1 else "msedge.exe"
+intervalo = float(sys.argv[2]) if len(sys.argv) > 2 else None
+
+monitor = ProcessMonitor(watch=[nombre])
+monitor.refresh()
+print(monitor.count(nombre))
+
+# Con un intervalo, sigue contando; cada muestra solo lee los procesos nuevos.
+while intervalo:
+    time.sleep(intervalo)
+    monitor.refresh()
+    print(monitor.count(nombre), "{0:.1f} MB".format(monitor.rss(nombre) / 1048576))
@@ -1,12 +1,20 @@
+# Ejecutar como módulo desde la raíz del paquete: python -m webdriverdownloader.getlatsteedgewdversion
 import requests
 import sys
 import os
 import platform
+
+from .testWebDriverDownloaderBase import WebDriverDownloaderBase
+
 url = 'https://msedgedriver.azureedge.net/LATEST_STABLE'
-response = requests.get(url)
 
-if response.status_code == 200:
-    latest_version = response.text.strip()
+# La versión se guarda en la caché en disco del descargador y solo se vuelve a pedir al servidor al expirar.
+try:
+    latest_version = WebDriverDownloaderBase().get_latest_version(url)
+except (requests.RequestException, RuntimeError):
+    latest_version = None
+
+if latest_version is not None:
     response = url+"/"+latest_version+"/"+"msedgedriver.exe"
     print(response)
     print(f"La última versión estable de Edge WebDriver es: {latest_version}")
@@ -0,0 +1,172 @@
+"""
+Incremental, PID-keyed view of the process table.
+
+psutil.process_iter() opens every process on each call.  ProcessMonitor lists the PIDs only, reads name and parent of
+new PIDs once, drops the exited ones and refreshes the RSS of the watched process names, so a sample costs about one
+directory listing plus the watched processes.  Counts and RSS are kept per name and can be queried per parent tree.
+A PID reused by a new process between two samples keeps the name of the exited one until it exits in turn.
+"""
+import collections
+import threading
+
+import psutil
+
+
+ProcessInfo = collections.namedtuple("ProcessInfo", ["pid", "ppid", "name", "rss"])
+
+
+class ProcessMonitor(object):
+    """Keeps counts and RSS per process name and per parent tree up to date."""
+
+    def __init__(self, watch=None, track_rss=True):
+        """
+        :param watch: Process names whose RSS is refreshed at every sample, e.g. ["msedge.exe"].  None (default)
+                      refreshes every process.
+        :param track_rss: Boolean (default=True) indicating if RSS is read at all.
+        """
+        self.watch = set(watch) if watch is not None else None
+        self.track_rss = track_rss
+        self.samples = 0
+        self._processes = {}
+        self._psutil_processes = {}
+        self._children = collections.defaultdict(set)
+        self._counts = collections.Counter()
+        self._rss = collections.Counter()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _is_watched(self, name):
+        return self.track_rss and (self.watch is None or name in self.watch)
+
+    def _add(self, pid):
+        """Reads a new process; returns None if it already exited."""
+        try:
+            process = psutil.Process(pid)
+            with process.oneshot():
+                name, ppid = process.name(), process.ppid()
+                rss = process.memory_info().rss if self._is_watched(name) else 0
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+        self._processes[pid] = ProcessInfo(pid, ppid, name, rss)
+        if self._is_watched(name):
+            self._psutil_processes[pid] = process
+        self._children[ppid].add(pid)
+        self._counts[name] += 1
+        self._rss[name] += rss
+        return self._processes[pid]
+
+    def _remove(self, pid):
+        info = self._processes.pop(pid)
+        self._psutil_processes.pop(pid, None)
+        self._children[info.ppid].discard(pid)
+        if not self._children[info.ppid]:
+            del self._children[info.ppid]
+        self._counts[info.name] -= 1
+        self._rss[info.name] -= info.rss
+        if not self._counts[info.name]:
+            del self._counts[info.name]
+            del self._rss[info.name]
+
+    def refresh(self):
+        """
+        Takes one sample: reads new PIDs, drops exited ones and refreshes the RSS of watched processes.
+
+        :returns: Tuple of the number of [0] new and [1] exited processes.
+        """
+        pids = set(psutil.pids())
+        with self._lock:
+            known = self._processes.keys()
+            new, exited = pids - known, known - pids
+            for pid in exited:
+                self._remove(pid)
+            for pid in new:
+                self._add(pid)
+            for pid, process in list(self._psutil_processes.items()):
+                if pid in new:
+                    continue
+                info = self._processes[pid]
+                try:
+                    rss = process.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+                self._rss[info.name] += rss - info.rss
+                self._processes[pid] = info._replace(rss=rss)
+            self.samples += 1
+        return len(new), len(exited)
+
+    def count(self, name):
+        """
+        :param name: Process name, e.g. "msedge.exe".
+        :returns: The number of processes with that name at the last sample.
+        """
+        with self._lock:
+            return self._counts.get(name, 0)
+
+    def rss(self, name):
+        """
+        :param name: Process name.
+        :returns: The total RSS in bytes of the processes with that name at the last sample.
+        """
+        with self._lock:
+            return self._rss.get(name, 0)
+
+    def counts(self):
+        """
+        :returns: Dict of process name to number of processes.
+        """
+        with self._lock:
+            return dict(self._counts)
+
+    def descendants(self, pid):
+        """
+        :param pid: PID of the root of the tree, e.g. a robot or this scheduler.
+        :returns: List of ProcessInfo of every process below the root, at the last sample.
+        """
+        with self._lock:
+            result, stack = [], [pid]
+            while stack:
+                for child in self._children.get(stack.pop(), ()):
+                    result.append(self._processes[child])
+                    stack.append(child)
+            return result
+
+    def tree(self, pid, name=None):
+        """
+        :param pid: PID of the root of the tree.
+        :param name: Only count processes with this name.  None (default) counts every descendant.
+        :returns: Tuple of [0] the number and [1] the total RSS in bytes of the descendants of the root.
+        """
+        processes = [info for info in self.descendants(pid) if name is None or info.name == name]
+        return len(processes), sum(info.rss for info in processes)
+
+    def start(self, interval=1.0):
+        """
+        Starts sampling in a daemon thread.
+
+        :param interval: Seconds between two samples (default=1).
+        """
+        self.refresh()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._loop, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def _loop(self, interval):
+        while not self._stopped.wait(interval):
+            self.refresh()
+
+    def stop(self):
+        """
+        Stops the sampling thread.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
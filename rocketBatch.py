@@ -0,0 +1,155 @@
+"""
+Micro-batching of queue items: several queue IDs per robot invocation.
+
+When queue items are short, starting the robot costs more than running them.  BatchScheduler groups consecutive items
+into batches, by count or by estimated duration, and hands each batch to one invocation, either as an argument file
+(when the command template contains "{batch}") or as JSON lines on stdin.  The robot answers with one JSON object per
+item on stdout, e.g. {"id": 4731, "returncode": 0, "duration": 0.02}, which is mapped back to per-item results.
+"""
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+from rocketScheduler import RobotScheduler, RunResult, buildCommand, killProcessTree
+
+
+def batchItems(items, max_items=10, max_duration=None, history=None):
+    """
+    Groups queue items into batches, lazily.
+
+    :param items: Iterable of queue items.
+    :param max_items: Maximum number of items per batch (default=10).
+    :param max_duration: Estimated seconds after which a batch is closed, using history.  None (default) groups by
+                         count only.
+    :param history: rocketHistory.DurationHistory giving the estimates for max_duration.  Required with
+                    max_duration.
+    :returns: Generator of batches as dicts: {"id": "batch-<n>", "items": [...]}.
+    """
+    if max_duration is not None and history is None:
+        raise ValueError("max_duration requires a history to estimate the items")
+    batch, estimate, number = [], 0.0, 0
+    for item in items:
+        batch.append(item)
+        if max_duration is not None:
+            estimate += history.estimate(item["id"])
+        if len(batch) >= max_items or (max_duration is not None and estimate >= max_duration):
+            number += 1
+            yield {"id": "batch-{0}".format(number), "items": batch}
+            batch, estimate = [], 0.0
+    if batch:
+        yield {"id": "batch-{0}".format(number + 1), "items": batch}
+
+
+class BatchScheduler(RobotScheduler):
+    """RobotScheduler running batches of queue items per robot invocation.
+
+    Concurrency, the window, timeouts and retries apply to whole invocations; run() yields one RunResult per queue
+    item, and the dead letter list holds the failed items.  idle_timeout is not supported.
+    """
+
+    def __init__(self, command_template, max_items=10, max_duration=None, history=None, **kwargs):
+        """
+        Accepts the parameters of RobotScheduler and the batching parameters of batchItems().
+
+        :param command_template: Command template of a batch invocation.  "{batch}" is replaced by the path of the
+                                 argument file, one JSON queue item per line; without it the items are written to
+                                 stdin.
+        """
+        if max_duration is not None and history is None:
+            raise ValueError("max_duration requires a history to estimate the items")
+        super(BatchScheduler, self).__init__(command_template, **kwargs)
+        self.max_items = max_items
+        self.max_duration = max_duration
+        self.history = history
+
+    def _wait(self, batch, events, attempt=1):
+        """Runs one attempt of a batch and puts its RunResult, with per-item results in batch["results"], on the
+        events queue.  A retried batch only carries the items that did not succeed in an earlier attempt."""
+        started = time.perf_counter()
+        done = batch.setdefault("done", {})
+        items = [item for item in batch["items"] if str(item["id"]) not in done]
+        if not items:
+            batch["results"] = [done[str(item["id"])] for item in batch["items"]]
+            events.put(("result", RunResult(batch, 0, 0.0, False, None, attempt)))
+            return
+        payload = "".join(json.dumps(item) + "\n" for item in items)
+        batch_filename = process = None
+        template = self.command_template
+        use_file = "{batch}" in (template if isinstance(template, str) else " ".join(template))
+        timed_out = False
+        try:
+            if use_file:
+                fd, batch_filename = tempfile.mkstemp(prefix="rocketbatch-", suffix=".jsonl")
+                with os.fdopen(fd, "w") as fileobj:
+                    fileobj.write(payload)
+                payload = None
+            command = buildCommand(self.command_template, {"id": batch["id"], "batch": batch_filename})
+            # Bytes that are not UTF-8, e.g. a print of the bot in the console code page, must not end the attempt.
+            process = self.popen(command, stdin=subprocess.DEVNULL if use_file else subprocess.PIPE,
+                                 stdout=subprocess.PIPE, universal_newlines=True, errors="replace")
+            try:
+                output, _ = process.communicate(payload, timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                timed_out = True
+                killProcessTree(process)
+                output, _ = process.communicate()
+            replies = {}
+            for line in output.splitlines():
+                try:
+                    reply = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(reply, dict) and "id" in reply:
+                    replies[str(reply["id"])] = reply
+        except Exception as exc:
+            # Any failure of the attempt, e.g. a template key missing from the batch, becomes its result: run()
+            # waits for one result per attempt.
+            if process is not None and process.poll() is None:
+                killProcessTree(process)
+            duration = time.perf_counter() - started
+            batch["results"] = [RunResult(item, None, duration, False, exc, attempt) for item in items]
+            events.put(("result", RunResult(batch, None, duration, False, exc, attempt)))
+            return
+        finally:
+            if batch_filename is not None:
+                os.remove(batch_filename)
+        duration = time.perf_counter() - started
+        results = {}
+        for item in items:
+            reply = replies.get(str(item["id"]))
+            if reply is None:
+                # Without an answer the item shares the fate of the invocation.
+                results[str(item["id"])] = RunResult(item, process.returncode, duration / len(items), timed_out, None,
+                                                     attempt)
+            else:
+                result = RunResult(item, reply.get("returncode"), reply.get("duration", duration / len(items)), False,
+                                   None, attempt)
+                results[str(item["id"])] = result
+                if result.returncode == 0:
+                    done[str(item["id"])] = result
+        batch["results"] = [done.get(str(item["id"])) or results[str(item["id"])] for item in batch["items"]]
+        events.put(("result", RunResult(batch, process.returncode, duration, timed_out, None, attempt)))
+
+    def _bury(self, result):
+        """Adds the items of a batch that failed for good to the dead letter list."""
+        for item_result in result.queue["results"]:
+            if item_result.returncode != 0:
+                super(BatchScheduler, self)._bury(item_result)
+
+    def run(self, items, window=None):
+        """
+        Runs the queue items in batches.
+
+        :param items: Iterable of queue items, consumed lazily.
+        :param window: Maximum number of batches taken and not yet finished.  Defaults to the concurrency limit.
+        :returns: Generator of one RunResult per queue item, batch by batch in order of completion.
+        """
+        batches = batchItems(items, self.max_items, self.max_duration, self.history)
+        for result in super(BatchScheduler, self).run(batches, window):
+            batch_failed = result.returncode != 0 or result.timed_out
+            for item_result in result.queue["results"]:
+                if item_result.returncode != 0 and not batch_failed:
+                    super(BatchScheduler, self)._bury(item_result)
+                yield item_result
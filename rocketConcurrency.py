@@ -0,0 +1,123 @@
+"""
+Adaptive concurrency for the robot schedulers, driven by the load of the host.
+
+The controller samples CPU, memory and the number of browser processes (msedge.exe by default, as in countProcess.py)
+with psutil.  It starts at the highest limit, lowers the number of in-flight runs quickly when any of them is over its
+target, and raises it again one run at a time, after a cool-down, while the host has headroom and every slot is in use.
+"""
+import collections
+import time
+
+import psutil
+
+
+LoadSample = collections.namedtuple("LoadSample", ["cpu_percent", "memory_percent", "browsers"])
+
+
+class AdaptiveConcurrency(object):
+    """Computes the concurrency limit of a scheduler between configured bounds."""
+
+    def __init__(self, min_concurrency=1, max_concurrency=8, initial=None, cpu_target=75.0, memory_target=80.0,
+                 max_browsers=None, browser_name="msedge.exe", children_only=True, interval=2.0, cooldown=10.0,
+                 headroom=10.0, monitor=None):
+        """
+        :param min_concurrency: Lowest limit the controller will set (default=1).
+        :param max_concurrency: Highest limit the controller will set (default=8).
+        :param initial: Starting limit.  Defaults to max_concurrency: the limit is lowered within one interval when
+                        the host is overloaded, but only raised one run per cooldown, so starting low would run a
+                        short batch almost serially.
+        :param cpu_target: System-wide CPU percentage above which the limit is lowered (default=75).
+        :param memory_target: Used memory percentage above which the limit is lowered (default=80).
+        :param max_browsers: Number of browser processes above which the limit is lowered.  None (default) ignores
+                             the browser count.
+        :param browser_name: Process name of the browser (default="msedge.exe").
+        :param children_only: Boolean (default=True) indicating if only browsers descending from this process are
+                              counted, rather than every browser on the host.
+        :param interval: Minimum number of seconds between two samples (default=2).
+        :param cooldown: Minimum number of seconds between a change of the limit and the next increase (default=10).
+        :param headroom: Percentage points below the CPU and memory targets required to increase the limit
+                         (default=10).  The band between the two thresholds keeps the limit from oscillating.
+        :param monitor: processMonitor.ProcessMonitor sampling in the background.  If specified, browsers are counted
+                        from its cache instead of walking the process table at every sample.
+        """
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.limit = initial if initial is not None else max_concurrency
+        self.cpu_target = cpu_target
+        self.memory_target = memory_target
+        self.max_browsers = max_browsers
+        self.browser_name = browser_name
+        self.children_only = children_only
+        self.interval = interval
+        self.cooldown = cooldown
+        self.headroom = headroom
+        self.monitor = monitor
+        self.last_sample = None
+        self._sampled_at = float("-inf")
+        self._changed_at = float("-inf")
+        self._process = psutil.Process()
+        # The first call only starts the measurement window of psutil.cpu_percent().
+        psutil.cpu_percent(interval=None)
+
+    def count_browsers(self):
+        """
+        Counts the browser processes, skipping those that exit while being inspected.
+
+        :returns: The number of processes named browser_name.
+        """
+        if self.monitor is not None:
+            if self.children_only:
+                return self.monitor.tree(self._process.pid, self.browser_name)[0]
+            return self.monitor.count(self.browser_name)
+        if self.children_only:
+            processes = self._process.children(recursive=True)
+        else:
+            processes = psutil.process_iter()
+        count = 0
+        for process in processes:
+            try:
+                if process.name() == self.browser_name:
+                    count += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return count
+
+    def sample(self):
+        """
+        Samples the load of the host.
+
+        :returns: A LoadSample.
+        """
+        browsers = self.count_browsers() if self.max_browsers is not None else 0
+        return LoadSample(psutil.cpu_percent(interval=None), psutil.virtual_memory().percent, browsers)
+
+    def update(self, running):
+        """
+        Samples the host if the interval has elapsed and adjusts the limit.
+
+        :param running: Number of runs currently in flight.
+        :returns: The concurrency limit to apply.
+        """
+        now = time.monotonic()
+        if now - self._sampled_at < self.interval:
+            return self.limit
+        self._sampled_at = now
+        sample = self.last_sample = self.sample()
+        overloaded = (sample.cpu_percent > self.cpu_target or sample.memory_percent > self.memory_target or
+                      (self.max_browsers is not None and sample.browsers > self.max_browsers))
+        if overloaded:
+            limit = max(self.min_concurrency, min(self.limit, running) * 3 // 4)
+            if limit < self.limit:
+                self.limit = limit
+                self._changed_at = now
+            return self.limit
+        has_headroom = (sample.cpu_percent < self.cpu_target - self.headroom and
+                        sample.memory_percent < self.memory_target - self.headroom)
+        if self.max_browsers is not None and running:
+            # Leave room for the browsers the next run is expected to open.
+            has_headroom = has_headroom and sample.browsers + sample.browsers / running <= self.max_browsers
+        if (has_headroom and running >= self.limit and self.limit < self.max_concurrency and
+                now - self._changed_at >= self.cooldown):
+            self.limit += 1
+            self._changed_at = now
+        return self.limit
@@ -0,0 +1,339 @@
+"""
+Distribution of queue items to robot workers on several machines.
+
+A Coordinator holds the backlog of queue items and leases them to WorkerAgents over TCP or a Unix socket.  Every
+worker announces its capacity and never holds more leases than that; it runs the leased items with its own
+RobotScheduler, renews its leases with heartbeats and reports every result.  A lease that is not renewed in time, e.g.
+because its worker died, expires and its item goes back to the front of the backlog.  The protocol is one JSON object
+per line, each request answered by one response:
+
+    {"op": "hello", "worker": "host-1", "capacity": 4}      -> {"ok": true}
+    {"op": "lease", "max": 1}                               -> {"ok": true, "leases": [...], "drained": false}
+    {"op": "heartbeat", "leases": ["<lease id>", ...]}      -> {"ok": true, "lost": [...]}
+    {"op": "done", "lease": "<lease id>", "result": {...}}  -> {"ok": true}
+"""
+import collections
+import itertools
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from rocketScheduler import RunResult
+
+
+logger = logging.getLogger(__name__)
+
+Lease = collections.namedtuple("Lease", ["item", "worker", "expires_at", "attempts"])
+
+
+def parseAddress(text):
+    """
+    Parses a coordinator address: "host:port" for TCP, anything containing a "/" for a Unix socket.
+
+    :param text: The address, as a str.
+    :returns: ("host", port) tuple or the socket path.
+    """
+    if "/" in text:
+        return text
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+    """Serves the requests of one worker connection."""
+
+    def handle(self):
+        coordinator = self.server.coordinator
+        worker = None
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                op = request["op"]
+                if op == "hello":
+                    worker = request["worker"]
+                    response = coordinator._hello(worker, request.get("capacity", 1))
+                elif worker is None:
+                    response = {"ok": False, "error": "hello expected"}
+                elif op == "lease":
+                    response = coordinator._lease(worker, request.get("max", 1))
+                elif op == "heartbeat":
+                    response = coordinator._heartbeat(worker, request.get("leases", []))
+                elif op == "done":
+                    response = coordinator._done(worker, request["lease"], request["result"])
+                else:
+                    response = {"ok": False, "error": "unknown op {0}".format(op)}
+            except (ValueError, KeyError, TypeError) as exc:
+                response = {"ok": False, "error": str(exc)}
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+class Coordinator(object):
+    """Leases queue items to remote workers and collects their results."""
+
+    def __init__(self, items, address=("127.0.0.1", 0), lease_ttl=30.0, max_attempts=3, window=1000):
+        """
+        :param items: Iterable of queue items, e.g. PRIMES or a rocketQueueSource source.  It is consumed lazily.
+        :param address: ("host", port) tuple to listen on with TCP, or the path of a Unix socket.  Port 0 (default)
+                        picks a free port; the bound address is in the address attribute.
+        :param lease_ttl: Seconds a lease stays valid without a heartbeat (default=30).
+        :param max_attempts: Number of leases an item may lose by expiry before it is given up (default=3).
+        :param window: Maximum number of items taken from the iterable and not yet finished (default=1000).
+        """
+        self.lease_ttl = lease_ttl
+        self.max_attempts = max_attempts
+        self.workers = {}
+        self.dead_letter = []
+        self._backlog = collections.deque()
+        self._leases = {}
+        self._results = collections.deque()
+        self._exhausted = False
+        self._lock = threading.Condition()
+        self._window = threading.BoundedSemaphore(window)
+        self._lease_ids = itertools.count(1)
+        self._closed = threading.Event()
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.remove(address)
+            self._server = _UnixServer(address, _CoordinatorHandler)
+        else:
+            self._server = _TCPServer(address, _CoordinatorHandler)
+        self._server.coordinator = self
+        self.address = self._server.server_address
+        threading.Thread(target=self._feed, args=(iter(items),), daemon=True).start()
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        threading.Thread(target=self._expire, daemon=True).start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Stops listening for workers.
+        """
+        self._closed.set()
+        self._server.shutdown()
+        self._server.server_close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+
+    def _feed(self, items):
+        """Moves queue items into the backlog, never more than the window ahead of the finished items."""
+        for item in items:
+            self._window.acquire()
+            with self._lock:
+                self._backlog.append((item, 0))
+                self._lock.notify_all()
+        with self._lock:
+            self._exhausted = True
+            self._lock.notify_all()
+
+    def _drained(self):
+        return self._exhausted and not self._backlog and not self._leases
+
+    def _hello(self, worker, capacity):
+        with self._lock:
+            self.workers[worker] = {"capacity": capacity, "seen_at": time.monotonic(), "done": 0}
+        logger.info("Worker {0} joined with capacity {1}".format(worker, capacity))
+        return {"ok": True, "lease_ttl": self.lease_ttl}
+
+    def _lease(self, worker, count):
+        with self._lock:
+            info = self.workers[worker]
+            info["seen_at"] = time.monotonic()
+            held = sum(1 for lease in self._leases.values() if lease.worker == worker)
+            count = max(0, min(count, info["capacity"] - held))
+            leases = []
+            while self._backlog and len(leases) < count:
+                item, attempts = self._backlog.popleft()
+                lease_id = "{0}-{1}".format(worker, next(self._lease_ids))
+                self._leases[lease_id] = Lease(item, worker, time.monotonic() + self.lease_ttl, attempts + 1)
+                leases.append({"lease": lease_id, "item": item, "attempt": attempts + 1})
+            return {"ok": True, "leases": leases, "drained": self._drained()}
+
+    def _heartbeat(self, worker, lease_ids):
+        with self._lock:
+            self.workers[worker]["seen_at"] = time.monotonic()
+            expires_at = time.monotonic() + self.lease_ttl
+            lost = []
+            for lease_id in lease_ids:
+                lease = self._leases.get(lease_id)
+                if lease is None or lease.worker != worker:
+                    lost.append(lease_id)
+                else:
+                    self._leases[lease_id] = lease._replace(expires_at=expires_at)
+            return {"ok": True, "lost": lost}
+
+    def _done(self, worker, lease_id, result):
+        with self._lock:
+            lease = self._leases.pop(lease_id, None)
+            if lease is None or lease.worker != worker:
+                # The lease expired and the item was handed to another worker, whose result counts.
+                logger.warning("Ignoring result of expired lease {0}".format(lease_id))
+                return {"ok": True, "ignored": True}
+            self.workers[worker]["done"] += 1
+            self._results.append(RunResult(lease.item, result.get("returncode"), result.get("duration", 0.0),
+                                           result.get("timed_out", False), result.get("error"),
+                                           lease.attempts - 1 + result.get("attempts", 1)))
+            self._lock.notify_all()
+        self._window.release()
+        return {"ok": True}
+
+    def _expire(self):
+        """Puts the items of expired leases back at the front of the backlog."""
+        while not self._closed.wait(min(1.0, self.lease_ttl / 4)):
+            now = time.monotonic()
+            given_up = 0
+            with self._lock:
+                for lease_id, lease in list(self._leases.items()):
+                    if lease.expires_at > now:
+                        continue
+                    del self._leases[lease_id]
+                    logger.warning("Lease {0} of worker {1} expired".format(lease_id, lease.worker))
+                    if lease.attempts >= self.max_attempts:
+                        result = RunResult(lease.item, None, self.lease_ttl, True, "lease expired", lease.attempts)
+                        self.dead_letter.append(result)
+                        self._results.append(result)
+                        given_up += 1
+                    else:
+                        self._backlog.appendleft((lease.item, lease.attempts))
+                self._lock.notify_all()
+            for _ in range(given_up):
+                self._window.release()
+
+    def results(self):
+        """
+        Waits for the results of every queue item.
+
+        :returns: Generator of RunResult in order of completion; it ends once the iterable is exhausted and every
+                  item is finished.
+        """
+        while True:
+            with self._lock:
+                while not self._results and not self._drained():
+                    self._lock.wait()
+                if not self._results:
+                    return
+                result = self._results.popleft()
+            yield result
+
+
+class WorkerAgent(object):
+    """Runs queue items leased from a Coordinator with a local scheduler."""
+
+    def __init__(self, address, scheduler, name=None, capacity=None, poll_interval=1.0):
+        """
+        :param address: Address of the coordinator, see parseAddress().
+        :param scheduler: RobotScheduler (or subclass, e.g. WarmPool) running the items on this machine.
+        :param name: Unique name of the worker.  Defaults to "<hostname>-<pid>".
+        :param capacity: Maximum number of leases held at once.  Defaults to scheduler.max_concurrency.
+        :param poll_interval: Seconds between two lease requests while the backlog is empty (default=1).
+        """
+        self.address = address
+        self.scheduler = scheduler
+        self.name = name or "{0}-{1}".format(socket.gethostname(), os.getpid())
+        self.capacity = capacity or scheduler.max_concurrency
+        self.poll_interval = poll_interval
+        self._socket = None
+        self._reader = None
+        self._lock = threading.Lock()
+        self._active = set()
+        self._slots = None
+        self._stopped = threading.Event()
+
+    def _request(self, **request):
+        """Sends one request to the coordinator and returns its response."""
+        with self._lock:
+            self._socket.sendall((json.dumps(request) + "\n").encode("utf-8"))
+            line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Coordinator closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise RuntimeError("Coordinator rejected {0}: {1}".format(request["op"], response.get("error")))
+        return response
+
+    def _leased_items(self):
+        """Generator of leased items, requesting one lease each time a local slot is free.  The scheduler pulls the
+        next item before its window has room, so a lease requested then would find the worker at capacity."""
+        while not self._stopped.is_set():
+            if not self._slots.acquire(timeout=self.poll_interval):
+                continue
+            try:
+                response = self._request(op="lease", max=1)
+            except OSError:
+                # The coordinator stops listening once every item is finished.
+                logger.info("Coordinator closed the connection, worker {0} stops".format(self.name))
+                return
+            if not response["leases"]:
+                self._slots.release()
+            for lease in response["leases"]:
+                with self._lock:
+                    self._active.add(lease["lease"])
+                item = dict(lease["item"])
+                item["_lease"] = lease["lease"]
+                yield item
+            if response["drained"]:
+                return
+            if not response["leases"]:
+                self._stopped.wait(self.poll_interval)
+
+    def _heartbeats(self, interval):
+        while not self._stopped.wait(interval):
+            with self._lock:
+                active = list(self._active)
+            if not active:
+                continue
+            try:
+                lost = self._request(op="heartbeat", leases=active)["lost"]
+            except (OSError, ValueError, RuntimeError):
+                return
+            if lost:
+                logger.warning("Leases lost by worker {0}: {1}".format(self.name, lost))
+
+    def run(self):
+        """
+        Connects to the coordinator and runs leased items until it has no more work.
+
+        :returns: Generator of the local RunResults, after each was reported to the coordinator.
+        """
+        family = socket.AF_UNIX if isinstance(self.address, str) else socket.AF_INET
+        self._socket = socket.socket(family, socket.SOCK_STREAM)
+        self._socket.connect(self.address)
+        self._reader = self._socket.makefile("r", encoding="utf-8")
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._stopped.clear()
+        try:
+            lease_ttl = self._request(op="hello", worker=self.name, capacity=self.capacity)["lease_ttl"]
+            threading.Thread(target=self._heartbeats, args=(lease_ttl / 3,), daemon=True).start()
+            for result in self.scheduler.run(self._leased_items(), window=self.capacity):
+                item = dict(result.queue)
+                lease_id = item.pop("_lease")
+                result = result._replace(queue=item)
+                self._request(op="done", lease=lease_id, result={
+                    "returncode": result.returncode, "duration": result.duration, "timed_out": result.timed_out,
+                    "error": None if result.error is None else str(result.error), "attempts": result.attempts})
+                with self._lock:
+                    self._active.discard(lease_id)
+                self._slots.release()
+                yield result
+        finally:
+            self._stopped.set()
+            self._reader.close()
+            self._socket.close()
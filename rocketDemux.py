@@ -0,0 +1,201 @@
+"""
+Demultiplexer rebuilding individual robot runs from the rocketbot logs (logs/<date>/logfile_*.log).
+
+When robots share a log file their Init, request and END lines interleave and the timestamps are no longer in file
+order.  Lines are attributed per file with the only signals the log has:
+
+- a request goes to the open run of its bot that executed the preceding line of the bot (request ordering) and whose
+  previous line is not later than the request; ties go to the run that started first
+- an "Execution time" line closes the pair of open run and "END bot" line whose END - Init interval is closest to the
+  reported execution time
+
+Runs are emitted in order of start time: per file a run is held back only while an earlier run is still open, and the
+files are merged with a heap that opens a file once the merge reaches the time in its name.  Memory is bounded by the
+runs open at once, not by the size of the corpus.  Usage:
+
+    python rocketDemux.py logs
+    python rocketDemux.py logs --jsonl > runs.jsonl
+"""
+import argparse
+import collections
+import glob
+import heapq
+import json
+import os.path
+import re
+from datetime import datetime
+
+from rocketHistory import parseExecutionTime
+from rocketLogIndex import INIT_PATTERN, parseLogLine
+
+
+RunRecord = collections.namedtuple("RunRecord", ["file", "bot", "started", "ended", "duration", "execution_time",
+                                                 "requests", "complete"])
+
+_END_PATTERN = re.compile(r"^END bot: (?P<bot>.*)$")
+_FILENAME_PATTERN = re.compile(r"logfile_(\d{6}_\d{6})\.log$")
+
+
+class _OpenRun(object):
+    """A run whose Init was read and whose execution time was not."""
+
+    def __init__(self, bot, started):
+        self.bot = bot
+        self.started = started
+        self.last_line = 0
+        self.last_timestamp = started
+        self.requests = []
+
+    def record(self, path, ended=None, execution_time=None):
+        duration = (ended - self.started).total_seconds() if ended is not None else None
+        return RunRecord(path, self.bot, self.started, ended, duration, execution_time, tuple(self.requests),
+                         ended is not None and execution_time is not None)
+
+
+def _assign_request(open_runs, entry):
+    """Returns the open run a request line belongs to, or None."""
+    candidates = [run for run in open_runs if run.bot == entry["bot"] and run.last_line < entry["line"] and
+                  run.last_timestamp <= entry["timestamp"]]
+    if not candidates:
+        # Out-of-order timestamps beyond the previous line: fall back to request ordering alone.
+        candidates = [run for run in open_runs if run.bot == entry["bot"] and run.last_line < entry["line"]]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda run: (-run.last_line, run.started))
+
+
+def _close_run(open_runs, ends, timestamp, execution_time):
+    """Removes and returns the open run and END timestamp matching an execution time."""
+    best = None
+    for run in open_runs:
+        for end in ends:
+            if end[1] != run.bot or end[0] < run.started:
+                continue
+            error = abs((end[0] - run.started).total_seconds() - execution_time)
+            if best is None or error < best[0]:
+                best = (error, run, end)
+    if best is not None:
+        _, run, end = best
+        ends.remove(end)
+        open_runs.remove(run)
+        return run, end[0]
+    # No END line: the run closest to the reported execution time, ended at the execution time line.
+    candidates = [run for run in open_runs if run.started <= timestamp]
+    if not candidates:
+        return None, None
+    run = min(candidates, key=lambda run: abs((timestamp - run.started).total_seconds() - execution_time))
+    open_runs.remove(run)
+    return run, timestamp
+
+
+def demuxFile(path):
+    """
+    Rebuilds the runs of one log file.
+
+    :param path: Path of the log file.
+    :returns: Generator of RunRecord in order of start time.  Runs without END or execution time at the end of the
+              file are emitted with complete=False.
+    """
+    open_runs = []
+    ends = []
+    finished = []
+    with open(path, encoding="utf-8", errors="replace") as fileobj:
+        for line in fileobj:
+            entry = parseLogLine(line.rstrip("\r\n"))
+            if entry is None:
+                continue
+            message, timestamp = entry["message"], entry["timestamp"]
+            if "action" in entry:
+                run = _assign_request(open_runs, entry)
+                if run is not None:
+                    run.last_line, run.last_timestamp = entry["line"], timestamp
+                    run.requests.append((entry["line"], entry["module"], entry["action"], entry["id"]))
+                continue
+            init = INIT_PATTERN.match(message)
+            if init is not None:
+                open_runs.append(_OpenRun(init.group("bot"), timestamp))
+                continue
+            end = _END_PATTERN.match(message)
+            if end is not None:
+                ends.append((timestamp, end.group("bot")))
+                continue
+            execution_time = parseExecutionTime(message)
+            if execution_time is None:
+                continue
+            run, ended = _close_run(open_runs, ends, timestamp, execution_time)
+            if run is None:
+                continue
+            heapq.heappush(finished, (run.started, id(run), run.record(path, ended, execution_time)))
+            oldest_open = min((run.started for run in open_runs), default=None)
+            while finished and (oldest_open is None or finished[0][0] <= oldest_open):
+                yield heapq.heappop(finished)[2]
+    for run in open_runs:
+        ended = min((end[0] for end in ends if end[1] == run.bot and end[0] >= run.started), default=None)
+        heapq.heappush(finished, (run.started, id(run), run.record(path, ended)))
+    while finished:
+        yield heapq.heappop(finished)[2]
+
+
+def _file_time(path):
+    """Returns the time in the name of a log file, before which none of its runs can start."""
+    match = _FILENAME_PATTERN.search(path)
+    if match is None:
+        return datetime.min
+    try:
+        return datetime.strptime(match.group(1), "%y%m%d_%H%M%S")
+    except ValueError:
+        return datetime.min
+
+
+def demuxLogs(paths):
+    """
+    Merges the runs of many log files in order of start time.  A file is only opened once every run starting before
+    the time in its name has been emitted, so the open files are those with runs in flight at the merge time.
+
+    :param paths: Iterable of log file paths.
+    :returns: Generator of RunRecord.
+    """
+    pending = sorted((_file_time(path), path) for path in paths)
+    pending.reverse()
+    heap = []
+    sequence = 0
+    while pending or heap:
+        while pending and (not heap or pending[-1][0] <= heap[0][0]):
+            _, path = pending.pop()
+            runs = demuxFile(path)
+            run = next(runs, None)
+            if run is not None:
+                heapq.heappush(heap, (run.started, sequence, run, runs))
+                sequence += 1
+        if not heap:
+            continue
+        _, _, run, runs = heapq.heappop(heap)
+        yield run
+        following = next(runs, None)
+        if following is not None:
+            heapq.heappush(heap, (following.started, sequence, following, runs))
+            sequence += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuilds individual runs from interleaved rocketbot logs.")
+    parser.add_argument("log_root")
+    parser.add_argument("--jsonl", action="store_true", help="Print one JSON object per run")
+    args = parser.parse_args()
+
+    paths = glob.glob(os.path.join(args.log_root, "*", "logfile_*.log"))
+    for run in demuxLogs(paths):
+        if args.jsonl:
+            record = run._asdict()
+            record["started"] = run.started.isoformat(" ")
+            record["ended"] = run.ended.isoformat(" ") if run.ended is not None else None
+            print(json.dumps(record))
+        else:
+            print("{0} {1:<10} {2:>9} {3:>9} {4:>2} req {5}{6}".format(
+                run.started, run.bot, "-" if run.duration is None else "{0:.6f}".format(run.duration),
+                "-" if run.execution_time is None else "{0:.6f}".format(run.execution_time), len(run.requests),
+                os.path.basename(run.file), "" if run.complete else " incomplete"))
+
+
+if __name__ == "__main__":
+    main()
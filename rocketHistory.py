@@ -0,0 +1,208 @@
+"""
+History of robot run durations and longest-processing-time-first ordering of queue items.
+
+Durations come from the "Execution time:" lines of the rocketbot logs and from scheduler results.  Each queue ID keeps
+an exponentially weighted moving average, so recent runs count more than old ones.  Runs whose queue ID cannot be
+found in the log are kept per bot and used as the estimate for queue IDs that have never run.
+"""
+import glob
+import json
+import os
+import os.path
+import re
+import statistics
+import tempfile
+
+
+QUEUE_PATTERN = r'execscriptpython .* - print\("[^"]*",\s*(\d+)\)'
+
+_LINE_PATTERN = re.compile(r"^\S+ \S+ - (?P<source>[^-]+?) - (?P<level>\w+) - (?P<message>.*)$")
+_INIT_PATTERN = re.compile(r"^Init bot \(-start\): (?P<bot>.*)$")
+_EXECUTION_TIME_PATTERN = re.compile(r"^Execution time: (?:(?P<days>\d+) days?, )?(?P<hours>\d+):(?P<minutes>\d+):"
+                                     r"(?P<seconds>\d+(?:\.\d+)?)$")
+
+
+def parseExecutionTime(text):
+    """
+    Parses the value of an "Execution time:" line, e.g. "0:00:00.764073".
+
+    :param text: The message of the log line.
+    :returns: The duration in seconds, or None if the message is not an execution time.
+    """
+    match = _EXECUTION_TIME_PATTERN.match(text)
+    if match is None:
+        return None
+    return (int(match.group("days") or 0) * 86400 + int(match.group("hours")) * 3600 +
+            int(match.group("minutes")) * 60 + float(match.group("seconds")))
+
+
+class DurationHistory(object):
+    """Moving averages of run durations per queue ID, persisted as a JSON file."""
+
+    def __init__(self, filename=None, alpha=0.3, default=60.0, queue_pattern=QUEUE_PATTERN):
+        """
+        :param filename: JSON file the history is loaded from and saved to.  If not specified, the history only lives
+                         in memory.
+        :param alpha: Weight of the newest duration in the moving average (default=0.3).
+        :param default: Estimate in seconds when nothing is known at all (default=60).
+        :param queue_pattern: Regular expression whose first group captures the queue ID in a log message.  The
+                              default matches the execscriptpython request printing the queue.
+        """
+        self.filename = filename
+        self.alpha = alpha
+        self.default = default
+        self.queue_pattern = re.compile(queue_pattern)
+        self.queues = {}
+        self.bots = {}
+        self.ingested = {}
+        if filename is not None and os.path.isfile(filename):
+            with open(filename) as fileobj:
+                data = json.load(fileobj)
+            self.queues = data.get("queues", {})
+            self.bots = data.get("bots", {})
+            self.ingested = data.get("ingested", {})
+
+    def save(self):
+        """
+        Writes the history to its file atomically.
+        """
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        fd, tmp_filename = tempfile.mkstemp(dir=directory, prefix=".history-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as fileobj:
+                json.dump({"queues": self.queues, "bots": self.bots, "ingested": self.ingested}, fileobj)
+            os.replace(tmp_filename, self.filename)
+        except BaseException:
+            os.remove(tmp_filename)
+            raise
+
+    def _update(self, entries, key, duration):
+        entry = entries.get(key)
+        if entry is None:
+            entries[key] = {"average": duration, "runs": 1}
+        else:
+            entry["average"] += self.alpha * (duration - entry["average"])
+            entry["runs"] += 1
+
+    def record(self, queue_id, duration, bot=None):
+        """
+        Adds one run duration.
+
+        :param queue_id: The queue ID, or None if unknown.
+        :param duration: Duration of the run in seconds.
+        :param bot: Name of the bot (the -start= argument), if known.
+        """
+        if queue_id is not None:
+            self._update(self.queues, str(queue_id), duration)
+        if bot is not None:
+            self._update(self.bots, bot, duration)
+
+    def record_result(self, result, bot=None):
+        """
+        Adds the duration of a scheduler result.  A run that timed out counts with its duration until the kill, which
+        is a lower bound of its real duration.
+
+        :param result: rocketScheduler.RunResult.
+        :param bot: Name of the bot, if known.
+        """
+        if result.error is None:
+            self.record(result.queue["id"], result.duration, bot)
+
+    def ingest_log(self, filename):
+        """
+        Adds the runs of one rocketbot log file.  The byte offset read so far and the runs in progress at that offset
+        are remembered per file, so a file that grew, like the log of today, is only read from where the previous
+        ingest stopped and no run is added twice.  Unchanged files are skipped; a file that shrank is read again.
+
+        Robots sharing a log file interleave their runs, so every Init opens a run, a queue ID goes to the latest open
+        run without one and an "Execution time" line closes the oldest open run.
+
+        :param filename: Path of a logfile_*.log file.
+        :returns: The number of runs added.
+        """
+        stat = os.stat(filename)
+        key = os.path.abspath(filename)
+        state = self.ingested.get(key)
+        if isinstance(state, list):
+            # Histories saved before offsets were kept: the file was read up to the size recorded then.
+            state = {"mtime": state[0], "size": state[1], "offset": state[1], "open": []}
+        elif state is not None and "open" not in state:
+            # Histories saved when a single run in progress was kept.
+            state["open"] = [[state.pop("bot"), state.pop("queue_id")]] if state.get("bot") is not None else []
+        if state is not None and [state["mtime"], state["size"]] == [stat.st_mtime, stat.st_size]:
+            return 0
+        if state is None or stat.st_size < state["offset"]:
+            state = {"offset": 0, "open": []}
+        runs = 0
+        offset, open_runs = state["offset"], [list(run) for run in state["open"]]
+        with open(filename, "rb") as fileobj:
+            fileobj.seek(offset)
+            for raw_line in fileobj:
+                if not raw_line.endswith(b"\n"):
+                    # A line still being written; it is read in full by the next ingest.
+                    break
+                offset += len(raw_line)
+                match = _LINE_PATTERN.match(raw_line.decode("utf-8", "replace").rstrip("\r\n"))
+                if match is None:
+                    continue
+                message = match.group("message")
+                init = _INIT_PATTERN.match(message)
+                if init is not None:
+                    open_runs.append([init.group("bot"), None])
+                    continue
+                duration = parseExecutionTime(message)
+                if duration is not None:
+                    bot, queue_id = open_runs.pop(0) if open_runs else (None, None)
+                    self.record(queue_id, duration, bot)
+                    runs += 1
+                    continue
+                waiting = [run for run in open_runs if run[1] is None]
+                if waiting:
+                    queue = self.queue_pattern.search(message)
+                    if queue is not None:
+                        waiting[-1][1] = queue.group(1)
+        self.ingested[key] = {"mtime": stat.st_mtime, "size": stat.st_size, "offset": offset, "open": open_runs}
+        return runs
+
+    def ingest_logs(self, log_root):
+        """
+        Adds the runs of every log file under a log root, i.e. <log_root>/<date>/logfile_*.log.
+
+        :param log_root: The logs directory.
+        :returns: The number of runs added.
+        """
+        return sum(self.ingest_log(filename) for filename in sorted(glob.glob(os.path.join(log_root, "*",
+                                                                                           "logfile_*.log"))))
+
+    def estimate(self, queue_id, bot=None):
+        """
+        Estimates the duration of a run.  Unseen queue IDs get the average of the bot, else the median of the known
+        queue IDs, else the default.
+
+        :param queue_id: The queue ID.
+        :param bot: Name of the bot, if known.
+        :returns: The expected duration in seconds.
+        """
+        entry = self.queues.get(str(queue_id))
+        if entry is not None:
+            return entry["average"]
+        if bot is not None and bot in self.bots:
+            return self.bots[bot]["average"]
+        if self.queues:
+            return statistics.median(entry["average"] for entry in self.queues.values())
+        if len(self.bots) == 1:
+            return next(iter(self.bots.values()))["average"]
+        return self.default
+
+
+def orderLongestFirst(items, history, bot=None):
+    """
+    Orders queue items longest-expected-first, which bounds the makespan of a batch on parallel robots by 4/3 of the
+    optimum instead of letting a long item started last stretch it.  Items with equal estimates keep their order.
+
+    :param items: Iterable of queue items as dicts with an "id" key.
+    :param history: DurationHistory providing the estimates.
+    :param bot: Name of the bot, if known.
+    :returns: A new list of the items.
+    """
+    return sorted(items, key=lambda item: -history.estimate(item["id"], bot))
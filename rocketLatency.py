@@ -0,0 +1,229 @@
+"""
+Run-latency analytics over the rocketbot logs (logs/<date>/logfile_*.log).
+
+Files are memory-mapped and scanned with a bytes regex for the SYSTEM "Init bot", "END bot" and "Execution time" lines
+only, so no file is decoded into Python strings.  Durations go into mergeable quantile sketches with a fixed relative
+error, one per bot and day, which use a few hundred buckets however many runs there are; memory grows with the number
+of bots, days and active minutes, not with the number of runs or lines.  The report gives p50/p95/p99, throughput per
+minute and the slowest runs, e.g.:
+
+    python rocketLatency.py logs --top 10
+"""
+import argparse
+import collections
+import glob
+import heapq
+import json
+import math
+import mmap
+import os.path
+import re
+
+from rocketHistory import parseExecutionTime
+
+
+EVENT_PATTERN = re.compile(rb"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d(?:\.\d+)?) - [^\r\n]*? - SYSTEM - "
+                           rb"(Init bot \(-start\): |END bot: |Execution time: )([^\r\n]*)", re.MULTILINE)
+
+
+class QuantileSketch(object):
+    """Quantile sketch with relative accuracy, keeping counts of logarithmic buckets (as in DDSketch).
+
+    A quantile is returned within relative_accuracy of the true value, and the number of buckets only grows with the
+    logarithm of the max/min ratio of the values, not with their count.
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-6):
+        """
+        :param relative_accuracy: Maximum relative error of a quantile (default=0.01).
+        :param min_value: Values below it, including 0, share the lowest bucket (default=1e-6).
+        """
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets = collections.Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = float("-inf")
+
+    def add(self, value):
+        key = math.ceil(math.log(max(value, self.min_value)) / self._log_gamma)
+        self.buckets[key] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        """
+        Adds the values of another sketch with the same relative accuracy.
+        """
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """
+        :param q: Quantile between 0 and 1, e.g. 0.95.
+        :returns: The estimated value, or None if the sketch is empty.
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return min(2 * self._gamma ** key / (self._gamma + 1), self.max)
+        return self.max
+
+
+class LatencyStats(object):
+    """Latency and throughput of the runs of one bot on one day."""
+
+    def __init__(self, relative_accuracy=0.01):
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.per_minute = collections.Counter()
+        self.started = 0
+
+    def merge(self, other):
+        self.sketch.merge(other.sketch)
+        self.per_minute.update(other.per_minute)
+        self.started += other.started
+
+    def summary(self):
+        """
+        :returns: Dict with runs, started, p50, p95, p99, mean and max duration in seconds, and the mean (over active
+                  minutes) and peak number of runs finished per minute.
+        """
+        sketch = self.sketch
+        return {
+            "runs": sketch.count,
+            "started": self.started,
+            "p50": sketch.quantile(0.5),
+            "p95": sketch.quantile(0.95),
+            "p99": sketch.quantile(0.99),
+            "mean": sketch.total / sketch.count if sketch.count else None,
+            "max": sketch.max if sketch.count else None,
+            "per_minute_mean": sketch.count / len(self.per_minute) if self.per_minute else 0.0,
+            "per_minute_peak": max(self.per_minute.values()) if self.per_minute else 0,
+        }
+
+
+class LatencyAnalyzer(object):
+    """Streams log files into per-bot, per-day statistics and the slowest runs."""
+
+    def __init__(self, top=10, relative_accuracy=0.01):
+        """
+        :param top: Number of slowest runs kept (default=10).
+        :param relative_accuracy: Relative accuracy of the percentiles (default=0.01).
+        """
+        self.top = top
+        self.relative_accuracy = relative_accuracy
+        self.stats = {}
+        self.slowest = []
+
+    def _stats(self, bot, day):
+        key = (bot, day)
+        if key not in self.stats:
+            self.stats[key] = LatencyStats(self.relative_accuracy)
+        return self.stats[key]
+
+    def add_file(self, path):
+        """
+        Scans one log file.  The "Execution time" line that follows an "END bot" line belongs to that bot; when runs
+        interleave, ENDs and execution times are paired in order.
+
+        :param path: Path of the log file.
+        """
+        with open(path, "rb") as fileobj:
+            if os.fstat(fileobj.fileno()).st_size == 0:
+                return
+            with mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                ended = collections.deque()
+                for match in EVENT_PATTERN.finditer(data):
+                    timestamp, event, value = match.groups()
+                    if event == b"Init bot (-start): ":
+                        day = timestamp[:10].decode("ascii")
+                        self._stats(value.decode("utf-8", "replace"), day).started += 1
+                    elif event == b"END bot: ":
+                        ended.append(value.decode("utf-8", "replace"))
+                    else:
+                        duration = parseExecutionTime("Execution time: " + value.decode("ascii", "replace"))
+                        if duration is None:
+                            continue
+                        bot = ended.popleft() if ended else None
+                        timestamp = timestamp.decode("ascii")
+                        stats = self._stats(bot, timestamp[:10])
+                        stats.sketch.add(duration)
+                        stats.per_minute[timestamp[:16]] += 1
+                        run = (duration, timestamp, bot, path)
+                        if len(self.slowest) < self.top:
+                            heapq.heappush(self.slowest, run)
+                        elif run > self.slowest[0]:
+                            heapq.heapreplace(self.slowest, run)
+
+    def add_logs(self, log_root):
+        """
+        Scans every log file under a log root, i.e. <log_root>/<date>/logfile_*.log.
+        """
+        for path in sorted(glob.glob(os.path.join(log_root, "*", "logfile_*.log"))):
+            self.add_file(path)
+
+    def per_bot(self):
+        """
+        :returns: Dict of bot to LatencyStats merged over all days.
+        """
+        merged = {}
+        for (bot, _), stats in self.stats.items():
+            merged.setdefault(bot, LatencyStats(self.relative_accuracy)).merge(stats)
+        return merged
+
+    def report(self):
+        """
+        :returns: Dict with "days" (per bot and day), "bots" (per bot) and "slowest" (slowest runs first).
+        """
+        return {
+            "days": [dict(bot=bot, day=day, **stats.summary()) for (bot, day), stats in
+                     sorted(self.stats.items(), key=lambda item: (str(item[0][0]), item[0][1]))],
+            "bots": [dict(bot=bot, **stats.summary()) for bot, stats in
+                     sorted(self.per_bot().items(), key=lambda item: str(item[0]))],
+            "slowest": [{"duration": duration, "finished": timestamp, "bot": bot, "file": path}
+                        for duration, timestamp, bot, path in sorted(self.slowest, reverse=True)],
+        }
+
+
+def _format_seconds(value):
+    return "-" if value is None else "{0:.3f}".format(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run-latency percentiles and throughput of the rocketbot logs.")
+    parser.add_argument("log_root")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest runs to show")
+    parser.add_argument("--accuracy", type=float, default=0.01, help="Relative accuracy of the percentiles")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    analyzer = LatencyAnalyzer(top=args.top, relative_accuracy=args.accuracy)
+    analyzer.add_logs(args.log_root)
+    report = analyzer.report()
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    header = "{0:<12} {1:<10} {2:>6} {3:>9} {4:>9} {5:>9} {6:>9} {7:>8} {8:>8}".format(
+        "bot", "day", "runs", "p50 s", "p95 s", "p99 s", "max s", "avg/min", "peak/min")
+    print(header)
+    for row in report["days"] + [dict(row, day="all") for row in report["bots"]]:
+        print("{0:<12} {1:<10} {2:>6} {3:>9} {4:>9} {5:>9} {6:>9} {7:8.2f} {8:>8}".format(
+            str(row["bot"]), row["day"], row["runs"], _format_seconds(row["p50"]), _format_seconds(row["p95"]),
+            _format_seconds(row["p99"]), _format_seconds(row["max"]), row["per_minute_mean"],
+            row["per_minute_peak"]))
+    print("\nslowest runs")
+    for run in report["slowest"]:
+        print("{0:>9} {1} {2} {3}".format(_format_seconds(run["duration"]), run["finished"], run["bot"], run["file"]))
+
+
+if __name__ == "__main__":
+    main()
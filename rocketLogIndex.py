@@ -0,0 +1,240 @@
+"""
+Indexed, parallel ingestion of the rocketbot logs (logs/<date>/logfile_*.log) into SQLite.
+
+Each line "<timestamp> - <source> - <level> - <message>" becomes one row; request messages are split further into
+bot, line, module, action, request id and payload, e.g.:
+
+    request: prueba : line 2 - rpascripts : execscriptpython  id: 9a5049c2-... -  - print(">>>",{queue})
+
+Files are parsed in a process pool and written by the parent in batched transactions.  The index remembers the
+mtime and size of every file, so a new ingest only parses the files that are new or changed, and drops the files that
+were deleted.  Usage:
+
+    python rocketLogIndex.py logs logs.db
+    python rocketLogIndex.py logs logs.db --request 9a5049c2-d7c6-5d88-ba6f-31ad30c9d9cc
+    python rocketLogIndex.py logs logs.db --bot prueba --line 2
+"""
+import argparse
+import concurrent.futures
+import glob
+import os
+import os.path
+import re
+import sqlite3
+from datetime import datetime
+
+
+LINE_PATTERN = re.compile(r"^(?P<timestamp>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d(?:\.\d+)?) - (?P<source>.+?) - "
+                          r"(?P<level>[A-Z]+) - (?P<message>.*)$")
+REQUEST_PATTERN = re.compile(r"^request: (?P<bot>.*?) : line (?P<line>\d+) - (?P<module>\S+) : (?P<action>\S+)\s+"
+                             r"id: (?P<id>\S*) - .*? - (?P<payload>.*)$")
+INIT_PATTERN = re.compile(r"^Init bot \(-start\): (?P<bot>.*)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    lines INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    file_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    ts REAL,
+    source TEXT,
+    level TEXT,
+    run INTEGER,
+    bot TEXT,
+    req_line INTEGER,
+    module TEXT,
+    action TEXT,
+    request_id TEXT,
+    payload TEXT,
+    message TEXT,
+    PRIMARY KEY (file_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_bot_line ON entries (bot, req_line);
+CREATE INDEX IF NOT EXISTS entries_request_id ON entries (request_id);
+CREATE INDEX IF NOT EXISTS entries_ts ON entries (ts);
+"""
+
+
+def parseLogLine(line):
+    """
+    Parses one log line.
+
+    :param line: The line, without its newline.
+    :returns: Dict with timestamp (datetime), source, level and message, plus bot, line, module, action, id and
+              payload for request messages; None if the line does not start with a timestamp.
+    """
+    match = LINE_PATTERN.match(line)
+    if match is None:
+        return None
+    entry = match.groupdict()
+    entry["timestamp"] = datetime.fromisoformat(entry["timestamp"])
+    request = REQUEST_PATTERN.match(entry["message"])
+    if request is not None:
+        entry.update(request.groupdict())
+        entry["line"] = int(entry["line"])
+    return entry
+
+
+def parseLogFile(path):
+    """
+    Parses a log file into index rows.  Runs in the worker processes of the pool.
+
+    :param path: Path of the log file.
+    :returns: Tuple of [0] the path, [1] its mtime, [2] its size and [3] the list of rows (seq, ts, source, level,
+              run, bot, req_line, module, action, request_id, payload, message).  run counts the "Init bot" lines
+              read so far, so lines of runs interleaved in one file are attributed to the latest run.
+    """
+    stat = os.stat(path)
+    rows = []
+    run, bot = 0, None
+    with open(path, encoding="utf-8", errors="replace") as fileobj:
+        for seq, line in enumerate(fileobj):
+            line = line.rstrip("\r\n")
+            entry = parseLogLine(line)
+            if entry is None:
+                rows.append((seq, None, None, None, run or None, bot, None, None, None, None, None, line))
+                continue
+            init = INIT_PATTERN.match(entry["message"])
+            if init is not None:
+                run, bot = run + 1, init.group("bot")
+            ts = entry["timestamp"].timestamp()
+            if "action" in entry:
+                rows.append((seq, ts, entry["source"], entry["level"], run or None, entry["bot"], entry["line"],
+                             entry["module"], entry["action"], entry["id"], entry["payload"], None))
+            else:
+                rows.append((seq, ts, entry["source"], entry["level"], run or None, bot, None, None, None, None, None,
+                             entry["message"]))
+    return path, stat.st_mtime, stat.st_size, rows
+
+
+class LogIndex(object):
+    """SQLite index of the rocketbot log corpus."""
+
+    def __init__(self, database):
+        """
+        :param database: Path of the SQLite database; it is created if needed.
+        """
+        self.connection = sqlite3.connect(database)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def _changed_files(self, paths):
+        """Returns the paths whose mtime or size differ from the index."""
+        known = {path: (mtime, size) for path, mtime, size in
+                 self.connection.execute("SELECT path, mtime, size FROM files")}
+        changed = []
+        for path in paths:
+            stat = os.stat(path)
+            if known.get(path) != (stat.st_mtime, stat.st_size):
+                changed.append(path)
+        return changed
+
+    def _drop_deleted_files(self, log_root, paths):
+        """Removes the files of a log root that no longer exist from the index."""
+        prefix = os.path.join(os.path.abspath(log_root), "")
+        existing = set(paths)
+        with self.connection:
+            for file_id, path in self.connection.execute("SELECT id, path FROM files WHERE substr(path, 1, ?) = ?",
+                                                         (len(prefix), prefix)).fetchall():
+                if path not in existing:
+                    self.connection.execute("DELETE FROM entries WHERE file_id = ?", (file_id,))
+                    self.connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _store_file(self, path, mtime, size, rows):
+        """Replaces the rows of one file in the current transaction."""
+        row = self.connection.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            file_id = self.connection.execute("INSERT INTO files (path, mtime, size, lines) VALUES (?, ?, ?, ?)",
+                                              (path, mtime, size, len(rows))).lastrowid
+        else:
+            file_id = row[0]
+            self.connection.execute("DELETE FROM entries WHERE file_id = ?", (file_id,))
+            self.connection.execute("UPDATE files SET mtime = ?, size = ?, lines = ? WHERE id = ?",
+                                    (mtime, size, len(rows), file_id))
+        self.connection.executemany("INSERT INTO entries VALUES ({0})".format(", ".join("?" * 13)),
+                                    [(file_id,) + row for row in rows])
+
+    def ingest(self, log_root, max_workers=None, chunksize=16, commit_every=200):
+        """
+        Parses the new and changed log files under a log root in a process pool and stores them.
+
+        :param log_root: The logs directory, i.e. <log_root>/<date>/logfile_*.log.
+        :param max_workers: Number of parser processes.  Defaults to the number of CPUs.
+        :param chunksize: Number of files handed to a parser process at once (default=16).
+        :param commit_every: Number of files stored per transaction (default=200).  An interrupted ingest keeps the
+                             files committed so far.
+        :returns: Tuple of the number of [0] files parsed and [1] lines stored.
+        """
+        paths = sorted(os.path.abspath(path) for path in glob.glob(os.path.join(log_root, "*", "logfile_*.log")))
+        self._drop_deleted_files(log_root, paths)
+        changed = self._changed_files(paths)
+        if not changed:
+            return 0, 0
+        lines = 0
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for number, (path, mtime, size, rows) in enumerate(executor.map(parseLogFile, changed,
+                                                                                chunksize=chunksize), 1):
+                    self._store_file(path, mtime, size, rows)
+                    lines += len(rows)
+                    if number % commit_every == 0:
+                        self.connection.commit()
+            except BaseException:
+                self.connection.rollback()
+                raise
+            self.connection.commit()
+        return len(changed), lines
+
+    def find_request(self, request_id):
+        """
+        :param request_id: Id of a request, e.g. "9a5049c2-d7c6-5d88-ba6f-31ad30c9d9cc".
+        :returns: List of (path, seq, ts, bot, req_line, module, action, payload) of its executions.
+        """
+        return self.connection.execute(
+            "SELECT f.path, e.seq, e.ts, e.bot, e.req_line, e.module, e.action, e.payload FROM entries e "
+            "JOIN files f ON f.id = e.file_id WHERE e.request_id = ? ORDER BY e.ts", (request_id,)).fetchall()
+
+    def runs_executing_line(self, bot, line):
+        """
+        :param bot: Name of the bot, e.g. "prueba".
+        :param line: Line number of the bot.
+        :returns: List of (path, run, ts) of the runs of the bot that executed the line.
+        """
+        return self.connection.execute(
+            "SELECT f.path, e.run, MIN(e.ts) FROM entries e JOIN files f ON f.id = e.file_id "
+            "WHERE e.bot = ? AND e.req_line = ? GROUP BY e.file_id, e.run ORDER BY MIN(e.ts)", (bot, line)).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexes the rocketbot logs into SQLite.")
+    parser.add_argument("log_root")
+    parser.add_argument("database")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--request", default=None, help="Show the executions of a request id")
+    parser.add_argument("--bot", default=None, help="With --line, show the runs of a bot that executed a line")
+    parser.add_argument("--line", type=int, default=None)
+    args = parser.parse_args()
+
+    index = LogIndex(args.database)
+    try:
+        files, lines = index.ingest(args.log_root, max_workers=args.workers)
+        print("{0} files parsed, {1} lines indexed".format(files, lines))
+        if args.request:
+            for row in index.find_request(args.request):
+                print(row)
+        if args.bot is not None and args.line is not None:
+            for row in index.runs_executing_line(args.bot, args.line):
+                print(row)
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
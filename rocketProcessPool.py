@@ -1,5 +1,8 @@
-import concurrent.futures
-from subprocess import Popen, CREATE_NEW_CONSOLE, run
+import argparse
+import os.path
+import sys
+
+from rocketScheduler import ROBOT_COMMAND, RobotScheduler
 
 # PRIMES = [
 #     {"id": 4731},
@@ -47,24 +50,119 @@ PRIMES = [
 ]
 
 
-def runRobotAsync(queue):
-    run(
-        [
-            "D:/Rocketbot_win_20240528/rocketbot.exe",
-            "-start=prueba",
-            "-db=D:/Rocketbot/Tests/robot.db",
-            "-queue=" + str(queue["id"]),
-        ],
-        creationflags=CREATE_NEW_CONSOLE,
-    )
-    return
+def main():
+    parser = argparse.ArgumentParser(description="Runs a Rocketbot robot for every queue.")
+    parser.add_argument("--command", default=ROBOT_COMMAND,
+                        help='Command template, e.g. "python stubRobot.py -queue={id}"')
+    parser.add_argument("--max-workers", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds before a robot is killed")
+    parser.add_argument("--idle-timeout", type=float, default=None,
+                        help="Seconds without CPU use by a robot and its browsers before it is killed as hung")
+    parser.add_argument("--retries", type=int, default=0, help="Retries of a failed or killed robot")
+    parser.add_argument("--dead-letter", default=None, help="JSONL file receiving the queues that failed for good")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Adjust the number of robots between --min-workers and --max-workers to the host load")
+    parser.add_argument("--min-workers", type=int, default=1)
+    parser.add_argument("--max-browsers", type=int, default=None, help="Most msedge.exe processes to allow")
+    parser.add_argument("--history", default=None,
+                        help="Duration history file; queues are then started longest-expected-first")
+    parser.add_argument("--logs", default="logs", help="Rocketbot log root read into the history")
+    parser.add_argument("--source", default=None,
+                        help='Queue source instead of PRIMES, e.g. "tail:queues.jsonl", "sqlite:queues.db", '
+                             '"sqlite:queues.db?requeue_after=3600", "tcp:127.0.0.1:9000" '
+                             '(see rocketQueueSource.openSource)')
+    parser.add_argument("--window", type=int, default=None, help="Most queues taken from the source at once")
+    parser.add_argument("--warm-command", default=None,
+                        help="Command of a long-lived robot worker reading queues on stdin, e.g. "
+                             '"python stubRobot.py -serve=1"; --command is then the one-shot fallback')
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Queues per robot invocation; --command then takes them in the file {batch} or on stdin")
+    parser.add_argument("--batch-duration", type=float, default=None,
+                        help="Expected seconds per batch, estimated from --history (required)")
+    parser.add_argument("--coordinator", default=None,
+                        help='Hand the queues out to remote workers listening at "host:port" or a Unix socket path')
+    parser.add_argument("--worker", default=None, help="Run queues leased from the coordinator at this address")
+    parser.add_argument("--lease-ttl", type=float, default=30.0, help="Seconds a lease lasts without a heartbeat")
+    args = parser.parse_args()
+    if args.batch_duration is not None and not args.history:
+        parser.error("--batch-duration requires --history to estimate the queues")
+    if (args.batch_size or args.batch_duration is not None) and args.idle_timeout is not None:
+        parser.error("--idle-timeout is not supported with --batch-size or --batch-duration")
+
+    queues = PRIMES
+    source = None
+    if args.source:
+        from rocketQueueSource import openSource
+        queues = source = openSource(args.source)
+    history = None
+    if args.history:
+        from rocketHistory import DurationHistory, orderLongestFirst
+        history = DurationHistory(args.history)
+        if os.path.isdir(args.logs):
+            history.ingest_logs(args.logs)
+        if source is None:
+            queues = orderLongestFirst(PRIMES, history)
 
+    if args.coordinator:
+        from rocketCoordinator import Coordinator, parseAddress
+        with Coordinator(queues, parseAddress(args.coordinator), lease_ttl=args.lease_ttl) as coordinator:
+            print("coordinator listening on {0}".format(coordinator.address))
+            for run in coordinator.results():
+                print(run)
+                if source is not None:
+                    source.ack(run)
+                if history is not None:
+                    history.record_result(run)
+        if history is not None:
+            history.save()
+        return
 
-def main():
-    with concurrent.futures.ProcessPoolExecutor(max_workers=5) as executor:
-        result = list(executor.map(runRobotAsync, PRIMES))
+    controller = None
+    if args.adaptive:
+        from rocketConcurrency import AdaptiveConcurrency
+        monitor = None
+        if args.max_browsers is not None:
+            from processMonitor import ProcessMonitor
+            monitor = ProcessMonitor(watch=["msedge.exe"])
+            monitor.start()
+        controller = AdaptiveConcurrency(args.min_workers, args.max_workers, max_browsers=args.max_browsers,
+                                         monitor=monitor)
+    options = dict(max_concurrency=args.max_workers, timeout=args.timeout, controller=controller,
+                   idle_timeout=args.idle_timeout, retries=args.retries, dead_letter_file=args.dead_letter)
+    if args.warm_command:
+        from rocketWarmPool import WarmPool
+        scheduler = WarmPool(args.warm_command, args.command, **options)
+    elif args.batch_size or args.batch_duration:
+        from rocketBatch import BatchScheduler
+        scheduler = BatchScheduler(args.command, max_items=args.batch_size or sys.maxsize,
+                                   max_duration=args.batch_duration, history=history, **options)
+    else:
+        scheduler = RobotScheduler(args.command, **options)
+    runs = scheduler.run(queues, window=args.window)
+    if args.worker:
+        from rocketCoordinator import WorkerAgent, parseAddress
+        runs = WorkerAgent(parseAddress(args.worker), scheduler).run()
+    result = []
+    try:
+        for run in runs:
+            print(run)
+            if source is not None:
+                source.ack(run)
+            else:
+                result.append(run)
+            if history is not None:
+                history.record_result(run)
+    finally:
+        if args.warm_command:
+            scheduler.close()
+        if history is not None:
+            history.save()
 
     print(result)
+    if args.warm_command and scheduler.warm_error is not None:
+        print("warm workers unavailable, ran one-shot: {0}".format(scheduler.warm_error))
+    if scheduler.dead_letter:
+        print("dead letter: {0}".format([run.queue["id"] for run in scheduler.dead_letter]))
 
 
 if __name__ == "__main__":
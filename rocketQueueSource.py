@@ -0,0 +1,280 @@
+"""
+Streaming sources of queue items for the robot schedulers.
+
+A source is an iterable of queue items (dicts with an "id" key) that is read lazily, so the scheduler only holds its
+in-flight window in memory.  Sources that never end (a followed file, a SQLite table that is polled, a socket) let one
+scheduler process new queue items continuously.  ack() is called with the RunResult of every item once it finishes.
+"""
+import json
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+
+
+def parseQueueItem(text):
+    """
+    Parses one line of a queue file: either a JSON object with an "id" key or a bare queue ID.
+
+    :param text: The line.
+    :returns: The queue item as a dict, or None for a blank line.
+    """
+    text = text.strip()
+    if not text:
+        return None
+    if text.startswith("{"):
+        return json.loads(text)
+    return {"id": int(text)}
+
+
+class QueueSource(object):
+    """Base class of queue sources."""
+
+    def __iter__(self):
+        raise NotImplementedError
+
+    def ack(self, result):
+        """
+        Called when the run of an item finished.
+
+        :param result: rocketScheduler.RunResult of the item.
+        """
+
+    def close(self):
+        """
+        Stops the source; an iteration waiting for new items ends.
+        """
+
+
+class FileSource(QueueSource):
+    """Reads queue items from a text or JSONL file, optionally following it like tail -f."""
+
+    def __init__(self, filename, follow=False, poll_interval=1.0):
+        """
+        :param filename: Path of the file, one queue item per line (see parseQueueItem()).
+        :param follow: Boolean (default=False) indicating if lines appended to the file are read as they come,
+                       until close() is called.
+        :param poll_interval: Seconds between two checks for appended lines (default=1).
+        """
+        self.filename = filename
+        self.follow = follow
+        self.poll_interval = poll_interval
+        self.offset = 0
+        self._closed = threading.Event()
+
+    def __iter__(self):
+        with open(self.filename, "rb") as fileobj:
+            fileobj.seek(self.offset)
+            while not self._closed.is_set():
+                line = fileobj.readline()
+                if line.endswith(b"\n") or (line and not self.follow):
+                    self.offset = fileobj.tell()
+                    item = parseQueueItem(line.decode("utf-8"))
+                    if item is not None:
+                        yield item
+                    continue
+                if not self.follow:
+                    return
+                # Incomplete last line: read it again once the writer finished it.
+                fileobj.seek(self.offset)
+                self._closed.wait(self.poll_interval)
+
+    def close(self):
+        self._closed.set()
+
+
+class SqliteSource(QueueSource):
+    """Claims queue items from a SQLite table and records their outcome in it.
+
+    The table has the columns id, payload (JSON object with extra item keys, or NULL), status ("pending", "running",
+    "done" or "failed"), returncode, duration and updated_at.  Items are claimed one at a time in a write transaction,
+    so several schedulers can share one database.
+    """
+
+    def __init__(self, database, table="queue", follow=False, poll_interval=1.0, requeue_after=None):
+        """
+        :param database: Path of the SQLite database; the table is created if needed.
+        :param table: Name of the table (default="queue").
+        :param follow: Boolean (default=False) indicating if the table is polled for new pending items until close()
+                       is called.
+        :param poll_interval: Seconds between two polls of an empty table (default=1).
+        :param requeue_after: Seconds after which an item still "running" is considered left behind by a scheduler
+                              that stopped, and set back to "pending" when the source is opened.  It must exceed the
+                              longest run, e.g. the timeout of the schedulers, or a running item of another scheduler
+                              sharing the database is run twice.  None (default) never requeues.
+        """
+        self.database = database
+        self.table = table
+        self.follow = follow
+        self.poll_interval = poll_interval
+        self._closed = threading.Event()
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS {0} (id INTEGER PRIMARY KEY, payload TEXT, "
+                               "status TEXT NOT NULL DEFAULT 'pending', returncode INTEGER, duration REAL, "
+                               "updated_at REAL)".format(table))
+            connection.execute("CREATE INDEX IF NOT EXISTS {0}_status ON {0} (status, id)".format(table))
+            if requeue_after is not None:
+                connection.execute("UPDATE {0} SET status = 'pending' WHERE status = 'running' AND "
+                                   "updated_at < ?".format(table), (time.time() - requeue_after,))
+
+    def _connect(self):
+        """Returns the connection of the calling thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.database, timeout=30,
+                                                                  isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def enqueue(self, items):
+        """
+        Adds pending queue items.
+
+        :param items: Iterable of queue items as dicts with an "id" key, or of bare queue IDs.
+        """
+        rows = []
+        for item in items:
+            if not isinstance(item, dict):
+                item = {"id": item}
+            extra = {key: value for key, value in item.items() if key != "id"}
+            rows.append((item["id"], json.dumps(extra) if extra else None, time.time()))
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany("INSERT OR REPLACE INTO {0} (id, payload, status, updated_at) "
+                                   "VALUES (?, ?, 'pending', ?)".format(self.table), rows)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _claim(self):
+        """Marks the oldest pending item as running and returns it, or None."""
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT id, payload FROM {0} WHERE status = 'pending' ORDER BY id "
+                                     "LIMIT 1".format(self.table)).fetchone()
+            if row is not None:
+                connection.execute("UPDATE {0} SET status = 'running', updated_at = ? WHERE id = ?".format(
+                    self.table), (time.time(), row[0]))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        item = json.loads(row[1]) if row[1] else {}
+        item["id"] = row[0]
+        return item
+
+    def __iter__(self):
+        while not self._closed.is_set():
+            item = self._claim()
+            if item is not None:
+                yield item
+            elif self.follow:
+                self._closed.wait(self.poll_interval)
+            else:
+                return
+
+    def ack(self, result):
+        status = "done" if result.returncode == 0 else "failed"
+        with self._connect() as connection:
+            connection.execute("UPDATE {0} SET status = ?, returncode = ?, duration = ?, updated_at = ? "
+                               "WHERE id = ?".format(self.table),
+                               (status, result.returncode, result.duration, time.time(), result.queue["id"]))
+
+    def close(self):
+        self._closed.set()
+
+
+class SocketSource(QueueSource):
+    """Receives queue items from local clients over TCP or a Unix socket, one item per line.
+
+    Items wait in a bounded buffer; when it is full the connection is no longer read, so the sender blocks instead of
+    the scheduler buffering without limit.
+    """
+
+    def __init__(self, address, maxsize=1000):
+        """
+        :param address: ("host", port) tuple for TCP, or the path of a Unix socket as a str.
+        :param maxsize: Maximum number of received items waiting for the scheduler (default=1000).
+        """
+        self.address = address
+        self._items = queue.Queue(maxsize)
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.remove(address)
+            self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(address)
+        self._server.listen()
+        self.address = self._server.getsockname()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._receive, args=(connection,), daemon=True).start()
+
+    def _receive(self, connection):
+        with connection, connection.makefile("rb") as fileobj:
+            for line in fileobj:
+                item = parseQueueItem(line.decode("utf-8"))
+                if item is not None:
+                    self._items.put(item)
+
+    def __iter__(self):
+        while True:
+            item = self._items.get()
+            if item is None:
+                return
+            yield item
+
+    def close(self):
+        self._server.close()
+        self._items.put(None)
+
+
+def openSource(spec):
+    """
+    Opens a queue source from a spec of the form "<kind>:<location>":
+
+    - "jsonl:queues.jsonl" or "file:queues.txt" reads a file once
+    - "tail:queues.jsonl" follows a file
+    - "sqlite:queues.db" claims pending items, "sqlite+follow:queues.db" keeps polling for new ones; a suffix
+      "?requeue_after=<seconds>" sets pending again the items a stopped scheduler left running, see SqliteSource
+    - "tcp:127.0.0.1:9000" or "unix:/tmp/queues.sock" listens for items sent by clients
+
+    :param spec: The source spec, as a str.
+    :returns: The QueueSource.
+    """
+    kind, _, location = spec.partition(":")
+    if kind in ("jsonl", "file"):
+        return FileSource(location)
+    if kind == "tail":
+        return FileSource(location, follow=True)
+    if kind in ("sqlite", "sqlite+follow"):
+        location, _, options = location.partition("?")
+        requeue_after = None
+        for option in filter(None, options.split("&")):
+            name, _, value = option.partition("=")
+            if name != "requeue_after":
+                raise ValueError("Unknown option of queue source {0}: {1}".format(spec, name))
+            requeue_after = float(value)
+        return SqliteSource(location, follow=kind == "sqlite+follow", requeue_after=requeue_after)
+    if kind == "tcp":
+        host, _, port = location.rpartition(":")
+        return SocketSource((host, int(port)))
+    if kind == "unix":
+        return SocketSource(location)
+    raise ValueError("Unknown queue source: {0}".format(spec))
@@ -0,0 +1,300 @@
+"""
+Scheduler launching Rocketbot robot processes directly, one per queue item.
+
+Every run is a child process started from a command template and watched by a small waiter thread, so a concurrency
+slot costs one robot process instead of an extra Python interpreter waiting on it.  Results are yielded as soon as
+each queue item finishes.  Runs that exceed their time limit or stop making progress are killed together with the
+browsers they started, and failed runs can be retried with a jittered exponential backoff.
+"""
+import collections
+import heapq
+import itertools
+import json
+import os
+import queue
+import random
+import shlex
+import signal
+import subprocess
+import threading
+import time
+
+
+ROBOT_COMMAND = [
+    "D:/Rocketbot_win_20240528/rocketbot.exe",
+    "-start=prueba",
+    "-db=D:/Rocketbot/Tests/robot.db",
+    "-queue={id}",
+]
+
+RunResult = collections.namedtuple("RunResult", ["queue", "returncode", "duration", "timed_out", "error",
+                                                 "attempts"], defaults=[1])
+
+
+def _unquote(arg):
+    """Removes the quotes shlex keeps around an argument in non-POSIX mode."""
+    if len(arg) >= 2 and arg[0] == arg[-1] and arg[0] in "\"'":
+        return arg[1:-1]
+    return arg
+
+
+def splitCommand(command):
+    """
+    Splits a command str into arguments with shlex.  On Windows it is split in non-POSIX mode, so backslashes of paths
+    such as "D:\\Rocketbot\\rocketbot.exe" are kept; the quotes around an argument are removed.
+
+    :param command: The command as a str, or already as a list of str, which is returned as a list.
+    :returns: The command as a list of str.
+    """
+    if not isinstance(command, str):
+        return list(command)
+    if os.name == "nt":
+        return [_unquote(arg) for arg in shlex.split(command, posix=False)]
+    return shlex.split(command)
+
+
+def buildCommand(template, item):
+    """
+    Builds the command line of one run.
+
+    :param template: List of arguments, or a str split with splitCommand(), where "{id}" and any other key of the
+                     queue item is replaced by its value.
+    :param item: Queue item as a dict, e.g. {"id": 4731}.
+    :returns: The command as a list of str.
+    """
+    return [arg.format(**item) for arg in splitCommand(template)]
+
+
+def killProcessTree(process):
+    """
+    Kills a robot process and every process it started, e.g. its browsers.  On POSIX the robot must lead its own
+    process group, as RobotScheduler.popen() arranges.
+
+    :param process: The subprocess.Popen of the robot.
+    """
+    if os.name == "nt":
+        subprocess.call(["taskkill", "/F", "/T", "/PID", str(process.pid)], stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL)
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    if process.poll() is None:
+        process.kill()
+
+
+def isTransientFailure(result):
+    """
+    Default retry policy: timed-out runs and non-zero exit codes are retried, robots that cannot be started are not.
+
+    :param result: RunResult of the failed attempt.
+    :returns: Boolean indicating if the attempt may succeed when repeated.
+    """
+    return result.error is None
+
+
+class RobotScheduler(object):
+    """Runs robot processes for a stream of queue items with bounded concurrency."""
+
+    def __init__(self, command_template=ROBOT_COMMAND, max_concurrency=5, timeout=None, new_console=True,
+                 controller=None, idle_timeout=None, retries=0, backoff_factor=1.0, backoff_max=60.0,
+                 retry_on=isTransientFailure, dead_letter_file=None):
+        """
+        :param command_template: Command template, see buildCommand().  Defaults to the Rocketbot command line.
+        :param max_concurrency: Maximum number of robot processes running at once (default=5).
+        :param timeout: Wall-clock limit of each run in seconds; the process tree is killed when it is exceeded.  None
+                        (default) waits forever.
+        :param new_console: Boolean (default=True) indicating if each robot gets its own console on Windows.
+        :param controller: Optional rocketConcurrency.AdaptiveConcurrency that replaces max_concurrency while
+                           running, according to the load of the host.
+        :param idle_timeout: Number of seconds without any CPU time used by the robot and its children after which
+                             the run is considered hung and killed.  Requires psutil.  None (default) disables it.
+        :param retries: Number of times a failed queue item is run again (default=0).
+        :param backoff_factor: Base delay in seconds before a retry; the n-th retry waits a random time up to
+                               backoff_factor * 2 ** (n - 1) (default=1).
+        :param backoff_max: Upper bound of the delay before a retry in seconds (default=60).
+        :param retry_on: Callable receiving the RunResult of a failed attempt and returning if it may be retried.
+                         Defaults to isTransientFailure().
+        :param dead_letter_file: JSONL file to which queue items that failed their last attempt are appended.  They
+                                 are always collected in the dead_letter list.
+        """
+        self.command_template = command_template
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.new_console = new_console
+        self.controller = controller
+        self.idle_timeout = idle_timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.retry_on = retry_on
+        self.dead_letter_file = dead_letter_file
+        self.dead_letter = []
+
+    def start(self, item):
+        """
+        Starts the robot process of one queue item.
+
+        :param item: Queue item as a dict.
+        :returns: The subprocess.Popen of the run.
+        """
+        return self.popen(buildCommand(self.command_template, item))
+
+    def popen(self, command, **kwargs):
+        """
+        Starts a robot process, in its own console on Windows if new_console is set and in its own process group on
+        POSIX, so that killProcessTree() reaches its children.
+
+        :param command: The command as a list of str.
+        :param kwargs: Additional keyword arguments for subprocess.Popen.
+        :returns: The subprocess.Popen.
+        """
+        if os.name == "nt":
+            if self.new_console:
+                kwargs["creationflags"] = subprocess.CREATE_NEW_CONSOLE
+        else:
+            kwargs["start_new_session"] = True
+        return subprocess.Popen(command, **kwargs)
+
+    def _watch(self, process):
+        """
+        Waits for a robot process, killing its tree when it exceeds the timeout or the idle timeout.
+
+        :returns: Tuple of [0] the return code and [1] a boolean indicating if the run was killed.
+        """
+        if self.idle_timeout is None:
+            try:
+                return process.wait(self.timeout), False
+            except subprocess.TimeoutExpired:
+                killProcessTree(process)
+                return process.wait(), True
+        import psutil
+
+        def treeCpuTime():
+            try:
+                tree = psutil.Process(process.pid)
+                return sum(sum(p.cpu_times()[:2]) for p in [tree] + tree.children(recursive=True))
+            except psutil.Error:
+                return None
+
+        deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+        cpu_time, progressed_at = treeCpuTime(), time.monotonic()
+        while True:
+            try:
+                return process.wait(min(1.0, self.idle_timeout)), False
+            except subprocess.TimeoutExpired:
+                pass
+            now = time.monotonic()
+            tree_cpu_time = treeCpuTime()
+            if tree_cpu_time is not None and tree_cpu_time != cpu_time:
+                cpu_time, progressed_at = tree_cpu_time, now
+            if now - progressed_at >= self.idle_timeout or (deadline is not None and now >= deadline):
+                killProcessTree(process)
+                return process.wait(), True
+
+    def _wait(self, item, events, attempt=1):
+        """
+        Runs one attempt of a queue item to completion and puts its RunResult on the events queue.  Any exception,
+        e.g. a command template referring to a key missing from the item, becomes the error of the result, since
+        run() waits for one result per attempt.
+        """
+        started = time.perf_counter()
+        process = None
+        try:
+            process = self.start(item)
+            returncode, timed_out = self._watch(process)
+        except Exception as exc:
+            if process is not None and process.poll() is None:
+                killProcessTree(process)
+            events.put(("result", RunResult(item, None, time.perf_counter() - started, False, exc, attempt)))
+            return
+        events.put(("result", RunResult(item, returncode, time.perf_counter() - started, timed_out, None, attempt)))
+
+    def _feed(self, items, window, events):
+        """Pulls queue items into the events queue, never more than the window ahead of the finished runs."""
+        try:
+            for item in items:
+                window.acquire()
+                events.put(("item", item))
+        except Exception as exc:
+            events.put(("error", exc))
+        else:
+            events.put(("end", None))
+
+    def _backoff(self, attempt):
+        """Returns the jittered delay before the given retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * 2 ** (attempt - 2)))
+
+    def _bury(self, result):
+        """Adds a queue item that failed for good to the dead letter list and file."""
+        self.dead_letter.append(result)
+        if self.dead_letter_file is not None:
+            with open(self.dead_letter_file, "a") as fileobj:
+                fileobj.write(json.dumps({"queue": result.queue, "returncode": result.returncode,
+                                          "timed_out": result.timed_out, "attempts": result.attempts,
+                                          "error": None if result.error is None else str(result.error),
+                                          "failed_at": time.time()}) + "\n")
+
+    def run(self, items, window=None):
+        """
+        Runs a robot for every queue item, never more than max_concurrency at once.  With a controller, the limit is
+        re-evaluated at least every controller.interval seconds.
+
+        :param items: Iterable of queue items, e.g. a rocketQueueSource source.  It is consumed in a separate thread,
+                      so a source waiting for new items does not hold back finished results.
+        :param window: Maximum number of items taken from the iterable and not yet finished.  Defaults to the highest
+                       possible concurrency limit.
+        :returns: Generator of one RunResult per queue item, in order of completion, holding the outcome, duration and
+                  number of the last attempt.  A failed result whose retries are exhausted is also in dead_letter.
+        """
+        if window is None:
+            window = self.max_concurrency
+            if self.controller is not None:
+                window = max(window, self.controller.max_concurrency)
+        window = threading.BoundedSemaphore(window)
+        events = queue.Queue()
+        threading.Thread(target=self._feed, args=(items, window, events), daemon=True).start()
+        pending = collections.deque()
+        delayed = []
+        sequence = itertools.count()
+        running = 0
+        exhausted = False
+        poll_interval = self.controller.interval if self.controller is not None else None
+        while True:
+            if self.controller is not None:
+                self.max_concurrency = self.controller.update(running)
+            now = time.monotonic()
+            while delayed and delayed[0][0] <= now:
+                _, _, item, attempt = heapq.heappop(delayed)
+                pending.appendleft((item, attempt))
+            while pending and running < self.max_concurrency:
+                item, attempt = pending.popleft()
+                threading.Thread(target=self._wait, args=(item, events, attempt), daemon=True).start()
+                running += 1
+            if exhausted and running == 0 and not pending and not delayed:
+                return
+            timeout = poll_interval
+            if delayed:
+                until_retry = max(0.0, delayed[0][0] - now)
+                timeout = until_retry if timeout is None else min(timeout, until_retry)
+            try:
+                kind, value = events.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            if kind == "item":
+                pending.append((value, 1))
+            elif kind == "end":
+                exhausted = True
+            elif kind == "error":
+                raise value
+            else:
+                running -= 1
+                if value.returncode != 0 or value.timed_out:
+                    if value.attempts <= self.retries and self.retry_on(value):
+                        ready_at = time.monotonic() + self._backoff(value.attempts + 1)
+                        heapq.heappush(delayed, (ready_at, next(sequence), value.queue, value.attempts + 1))
+                        continue
+                    self._bury(value)
+                window.release()
+                yield value
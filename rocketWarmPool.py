@@ -0,0 +1,167 @@
+"""
+Warm pool of long-lived robot workers.
+
+Starting a robot costs its whole initialisation for every queue item, which dominates when the bot body is short.  A
+warm worker is started once and runs queue items received over its stdin pipe: one JSON queue item per line in, one
+JSON object with at least "returncode" per line out (see stubRobot.py -serve=1); other output lines, e.g. prints of the
+bot, are skipped.  When no worker can be started or a worker exits before answering, the item is run with a one-shot
+launch of the regular command template instead.
+"""
+import json
+import subprocess
+import threading
+import time
+
+from rocketScheduler import ROBOT_COMMAND, RobotScheduler, RunResult, killProcessTree, splitCommand
+
+
+class WarmWorker(object):
+    """A running warm worker and the number of items it has run."""
+
+    def __init__(self, process):
+        self.process = process
+        self.runs = 0
+
+
+class WarmPool(RobotScheduler):
+    """RobotScheduler sending queue items to warm workers, with one-shot launches as fallback."""
+
+    def __init__(self, worker_command, command_template=ROBOT_COMMAND, max_runs_per_worker=None, **kwargs):
+        """
+        Accepts the parameters of RobotScheduler and two more.  idle_timeout only applies to one-shot launches.
+
+        :param worker_command: Command starting a warm worker, as a list of str or a str split with splitCommand().
+                               Unlike the command template it is used as is, so braces need no escaping.
+        :param max_runs_per_worker: Number of items after which a worker is replaced by a fresh one, e.g. to release
+                                    leaked browsers.  None (default) keeps workers until close().
+        """
+        super(WarmPool, self).__init__(command_template, **kwargs)
+        self.worker_command = worker_command
+        self.max_runs_per_worker = max_runs_per_worker
+        self.fallbacks = 0
+        self._idle = []
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._warm_failed = False
+        self.warm_error = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _acquire(self):
+        """Returns an idle worker, starting a new one if there is none."""
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.poll() is None:
+                    return worker
+                self._workers.discard(worker)
+        # Bytes that are not UTF-8, e.g. a print of the bot in the console code page, must not end the attempt.
+        process = self.popen(splitCommand(self.worker_command), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                             universal_newlines=True, errors="replace", bufsize=1)
+        worker = WarmWorker(process)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _release(self, worker):
+        """Returns a worker to the idle list, or retires it once it has run max_runs_per_worker items."""
+        if self.max_runs_per_worker is not None and worker.runs >= self.max_runs_per_worker:
+            self._retire(worker, graceful=True)
+            return
+        with self._lock:
+            self._idle.append(worker)
+
+    def _retire(self, worker, graceful=False):
+        """Stops a worker; gracefully by closing its stdin, otherwise by killing it."""
+        with self._lock:
+            self._workers.discard(worker)
+        if graceful:
+            worker.process.stdin.close()
+            try:
+                worker.process.wait(5)
+                return
+            except subprocess.TimeoutExpired:
+                pass
+        killProcessTree(worker.process)
+        worker.process.wait()
+
+    @staticmethod
+    def _parse_reply(line):
+        """Returns the reply of a worker output line, or None if the line is not one, e.g. a print of the bot."""
+        try:
+            reply = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(reply, dict) or "returncode" not in reply:
+            return None
+        return reply
+
+    def _wait(self, item, events, attempt=1):
+        """
+        Runs one attempt of a queue item on a warm worker and puts its RunResult on the events queue.  When no worker
+        can be started, e.g. because the worker command cannot be parsed, the cause is kept in warm_error and every
+        item is run one-shot from then on.
+        """
+        if self._warm_failed:
+            return super(WarmPool, self)._wait(item, events, attempt)
+        started = time.perf_counter()
+        try:
+            worker = self._acquire()
+        except Exception as exc:
+            self._warm_failed = True
+            self.warm_error = exc
+            return super(WarmPool, self)._wait(item, events, attempt)
+        timed_out = threading.Event()
+        timer = None
+        if self.timeout is not None:
+            def expire():
+                timed_out.set()
+                killProcessTree(worker.process)
+            timer = threading.Timer(self.timeout, expire)
+            timer.start()
+        reply = None
+        try:
+            worker.process.stdin.write(json.dumps(item) + "\n")
+            worker.process.stdin.flush()
+            while reply is None:
+                line = worker.process.stdout.readline()
+                if not line:
+                    break
+                reply = self._parse_reply(line)
+        except OSError:
+            pass
+        except Exception as exc:
+            # Any other failure becomes the result of the attempt: run() waits for one result per attempt.
+            self._retire(worker)
+            events.put(("result", RunResult(item, None, time.perf_counter() - started, False, exc, attempt)))
+            return
+        finally:
+            if timer is not None:
+                timer.cancel()
+        if reply is None:
+            self._retire(worker)
+            if timed_out.is_set():
+                events.put(("result", RunResult(item, worker.process.returncode, time.perf_counter() - started, True,
+                                                None, attempt)))
+                return
+            # The worker died before answering; the item may have run partially and is run again one-shot.
+            self.fallbacks += 1
+            return super(WarmPool, self)._wait(item, events, attempt)
+        worker.runs += 1
+        self._release(worker)
+        events.put(("result", RunResult(item, reply.get("returncode"), time.perf_counter() - started, False, None,
+                                        attempt)))
+
+    def close(self):
+        """
+        Stops every worker: idle workers get EOF on stdin and are killed if they do not exit.
+        """
+        with self._lock:
+            workers = list(self._workers)
+            self._idle = []
+        for worker in workers:
+            self._retire(worker, graceful=True)
@@ -0,0 +1,86 @@
+"""
+Failure-path checks for the robot schedulers using stubRobot.py: every queue item must come back as a RunResult, also
+when its attempt fails in an unexpected way, instead of leaving run() waiting for it, e.g.:
+
+    python stressRocketScheduler.py --items 20 --deadline 30
+"""
+import argparse
+import os.path
+import sys
+import threading
+
+from rocketBatch import BatchScheduler
+from rocketScheduler import RobotScheduler
+from rocketWarmPool import WarmPool
+
+
+STUB_ROBOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stubRobot.py")
+
+
+def collect(scheduler, items, deadline):
+    """
+    Runs the items in a daemon thread.
+
+    :returns: The list of RunResult, or None if run() did not finish within the deadline.
+    """
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(scheduler.run(items)), daemon=True)
+    thread.start()
+    thread.join(deadline)
+    return None if thread.is_alive() else results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--deadline", type=float, default=30.0, help="Seconds each scenario may take")
+    args = parser.parse_args()
+
+    items = [{"id": queue_id} for queue_id in range(args.items)]
+    scenarios = [
+        # "{queue}" is not a key of the items: buildCommand raises KeyError in the waiter thread.
+        ("missing template key", RobotScheduler([sys.executable, STUB_ROBOT, "-queue={queue}"],
+                                                max_concurrency=args.workers, retries=2, backoff_factor=0.01),
+         lambda result: isinstance(result.error, KeyError) and result.attempts == 1),
+        ("batch template key", BatchScheduler([sys.executable, STUB_ROBOT, "-queues={queue}"], max_items=3,
+                                              max_concurrency=args.workers),
+         lambda result: isinstance(result.error, KeyError)),
+        ("batch undecodable output", BatchScheduler([sys.executable, STUB_ROBOT, "-queues={batch}", "-garble=1",
+                                                     "-log=" + os.devnull], max_items=3, max_concurrency=args.workers),
+         lambda result: result.returncode == 0 and result.error is None),
+        ("missing executable", RobotScheduler([os.path.join(os.path.dirname(STUB_ROBOT), "no-such-robot")],
+                                              max_concurrency=args.workers),
+         lambda result: isinstance(result.error, OSError)),
+    ]
+    # Prints of the bot on the worker stdout, and braces in the worker command, which is not a template.
+    chatty = WarmPool([sys.executable, STUB_ROBOT, "-serve=1", "-chatter=1", "-start={bot}",
+                       "-log=" + os.devnull],
+                      [sys.executable, STUB_ROBOT, "-queue={id}"], max_concurrency=args.workers)
+    scenarios.append(("warm worker chatter", chatty, lambda result: result.returncode == 0 and result.error is None))
+    garbled = WarmPool([sys.executable, STUB_ROBOT, "-serve=1", "-garble=1", "-log=" + os.devnull],
+                       [sys.executable, STUB_ROBOT, "-queue={id}"], max_concurrency=args.workers)
+    scenarios.append(("warm undecodable output", garbled,
+                      lambda result: result.returncode == 0 and result.error is None))
+    # An unbalanced quote: splitCommand raises ValueError and every item runs one-shot.
+    unparsable = WarmPool(sys.executable + ' "' + STUB_ROBOT + " -serve=1",
+                          [sys.executable, STUB_ROBOT, "-queue={id}", "-log=" + os.devnull],
+                          max_concurrency=args.workers)
+    scenarios.append(("warm command unparsable", unparsable,
+                      lambda result: result.returncode == 0 and result.error is None))
+    for name, scheduler, expected in scenarios:
+        results = collect(scheduler, items, args.deadline)
+        assert results is not None, "{0}: run() did not finish within {1} s".format(name, args.deadline)
+        assert len(results) == args.items, "{0}: {1} results for {2} items".format(name, len(results), args.items)
+        assert all(expected(result) for result in results), "{0}: unexpected results {1}".format(name, results[:3])
+        failed = sum(result.returncode != 0 for result in results)
+        assert len(scheduler.dead_letter) == failed, "{0}: failed items missing from dead_letter".format(name)
+        print("{0:<24} {1} results ok".format(name, len(results)))
+    assert chatty.fallbacks == garbled.fallbacks == 0, "Warm workers fell back to one-shot launches"
+    assert isinstance(unparsable.warm_error, ValueError), "Unparsable worker command not reported"
+    for pool in (chatty, garbled, unparsable):
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
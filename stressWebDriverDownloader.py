@@ -0,0 +1,58 @@
+"""
+Stress test for concurrent installs of the same driver by several processes, as happens when rocketProcessPool.py
+launches its robots at once.  N processes call download_and_install for the same version against a local HTTP server;
+the archive must be downloaded once and every process must end up with the same, intact driver.  Run it as a module
+from the package root, e.g.:
+
+    python -m webdriverdownloader.stressWebDriverDownloader --processes 16
+"""
+import argparse
+import hashlib
+import io
+import multiprocessing
+import os
+import tempfile
+import zipfile
+
+from .benchWebDriverDownloader import LocalDownloader, serve
+
+
+def install(base_url, tmp, barrier):
+    downloader = LocalDownloader(base_url, download_root=os.path.join(tmp, "webdriver"),
+                                 link_path=os.path.join(tmp, "bin"), os_name="Linux")
+    barrier.wait()
+    driver_filename, _ = downloader.download_and_install("1.0", os_name="Linux", show_progress_bar=False)
+    with open(driver_filename, "rb") as fileobj:
+        return hashlib.sha256(fileobj.read()).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=8)
+    parser.add_argument("--rate-mb", type=float, default=32.0, help="Per-connection bandwidth limit in MB/s")
+    args = parser.parse_args()
+
+    driver = os.urandom(args.size_mb * 1024 * 1024)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, mode="w") as driver_zipfile:
+        driver_zipfile.writestr("msedgedriver", driver)
+    server = serve(archive.getvalue(), bytes_per_second=int(args.rate_mb * 1024 * 1024))
+    base_url = "http://{0}:{1}".format(*server.server_address)
+    with tempfile.TemporaryDirectory() as tmp:
+        context = multiprocessing.get_context("spawn")
+        with context.Manager() as manager:
+            barrier = manager.Barrier(args.processes)
+            with context.Pool(args.processes) as pool:
+                digests = pool.starmap(install, [(base_url, tmp, barrier)] * args.processes)
+    server.shutdown()
+
+    expected = hashlib.sha256(driver).hexdigest()
+    print("processes={0} downloads={1} intact={2}".format(args.processes, server.requests_served,
+                                                          sum(digest == expected for digest in digests)))
+    assert server.requests_served == 1, "The archive was downloaded {0} times".format(server.requests_served)
+    assert all(digest == expected for digest in digests), "Some processes got a corrupt driver"
+
+
+if __name__ == "__main__":
+    main()
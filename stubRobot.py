@@ -0,0 +1,93 @@
+"""
+Stand-in for rocketbot.exe to exercise the robot schedulers on any OS.
+
+Accepts the Rocketbot arguments (-start=, -db=, -queue=) plus a few knobs, sleeps to simulate the bot start-up and the
+work, and writes log lines in the Rocketbot format, e.g.:
+
+    python stubRobot.py -start=prueba -queue=4731 -startup=0.5 -work=0.02 -fail=0.1 -log=logs/stub.log
+
+With -serve=1 it starts once and then runs every queue item received on stdin, as a warm pool worker or for a batch;
+with -queues=PATH it runs every queue item of an argument file.  -chatter=1 prints a non-JSON line on stdout before
+each answer, like a bot printing from a script; -garble=1 writes a line that is not UTF-8, as a console code page
+would.
+"""
+import json
+import random
+import sys
+import time
+from datetime import datetime
+
+
+def parseArgs(argv):
+    args = {"start": "prueba", "startup": 0.0, "work": 0.0, "fail": 0.0, "hang": 0.0, "log": None, "serve": 0,
+            "chatter": 0, "garble": 0}
+    for arg in argv:
+        if arg.startswith("-") and "=" in arg:
+            key, value = arg[1:].split("=", 1)
+            args[key] = value
+    for key in ("startup", "work", "fail", "hang"):
+        args[key] = float(args[key])
+    args["serve"] = int(args["serve"])
+    args["chatter"] = int(args["chatter"])
+    args["garble"] = int(args["garble"])
+    return args
+
+
+def log(args, level, message):
+    line = "{0} - rocketbot - {1} - {2}".format(datetime.now(), level, message)
+    if args["log"]:
+        with open(args["log"], "a") as fileobj:
+            fileobj.write(line + "\n")
+    else:
+        print(line, file=sys.stderr if args["serve"] or args.get("queues") else sys.stdout)
+
+
+def runQueue(args, queue):
+    start = datetime.now()
+    log(args, "SYSTEM", "Init bot (-start): {0}".format(args["start"]))
+    log(args, "INFO", "request: {0} : line 1 - rpasystem : get_all_arguments  id: {1} -  - {{\"assign_to\":\"queue\"}}"
+        .format(args["start"], "f13969c6-a62a-86a9-588c-2ec73b279de2"))
+    log(args, "INFO", "request: {0} : line 2 - rpascripts : execscriptpython  id: {1} -  - print(\">>>>>>\",{2})"
+        .format(args["start"], "9a5049c2-d7c6-5d88-ba6f-31ad30c9d9cc", queue))
+    if random.random() < args["hang"]:
+        time.sleep(3600)
+    time.sleep(args["work"])
+    log(args, "SYSTEM", "END bot: {0}".format(args["start"]))
+    log(args, "SYSTEM", "Execution time: {0}".format(datetime.now() - start))
+    return 1 if random.random() < args["fail"] else 0
+
+
+def serve(args, lines):
+    # One JSON queue item (or bare queue ID) per line in, one JSON result per line on stdout.
+    for line in lines:
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if not isinstance(item, dict):
+            item = {"id": item}
+        start = time.perf_counter()
+        returncode = runQueue(args, item["id"])
+        if args["chatter"]:
+            sys.stdout.write(">>>>>> {0}\n".format(item["id"]))
+        if args["garble"]:
+            sys.stdout.flush()
+            sys.stdout.buffer.write("Ejecución {0}\n".format(item["id"]).encode("cp1252"))
+        sys.stdout.write(json.dumps({"id": item["id"], "returncode": returncode,
+                                     "duration": time.perf_counter() - start}) + "\n")
+        sys.stdout.flush()
+
+
+def main():
+    args = parseArgs(sys.argv[1:])
+    time.sleep(args["startup"])
+    if args["serve"]:
+        serve(args, sys.stdin)
+    elif args.get("queues"):
+        with open(args["queues"]) as fileobj:
+            serve(args, fileobj)
+    else:
+        sys.exit(runQueue(args, args.get("queue")))
+
+
+if __name__ == "__main__":
+    main()
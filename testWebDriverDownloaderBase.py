@@ -4,6 +4,12 @@ Module for managing the download of Selenium webdriver binaries.
 This code is released under the MIT license.
 """
 import abc
+import collections
+import concurrent.futures
+import contextlib
+import hashlib
+import importlib
+import json
 import logging
 import os
 import os.path
@@ -11,16 +17,13 @@ from pathlib import Path
 import platform
 import shutil
 import stat
-import tarfile
+import tempfile
+import threading
+import time
 try:
     from urlparse import urlparse, urlsplit  # Python 2.x import
 except ImportError:
     from urllib.parse import urlparse, urlsplit  # Python 3.x import
-import zipfile
-
-from bs4 import BeautifulSoup
-import requests
-import tqdm
 
 from .util import get_architecture_bitness
 
@@ -28,15 +31,216 @@ from .util import get_architecture_bitness
 logger = logging.getLogger(__name__)
 
 
+class _LazyModule(object):
+    """
+    Stand-in for a module that is imported on first attribute access.  Keeps the HTTP, progress bar and archive
+    libraries off the import path of short-lived processes that only check for an installed driver.
+    """
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def __getattr__(self, attr):
+        module = self.__dict__["_module"]
+        if module is None:
+            module = importlib.import_module(self.__dict__["_name"])
+            self.__dict__["_module"] = module
+        return getattr(module, attr)
+
+
+requests = _LazyModule("requests")
+tarfile = _LazyModule("tarfile")
+tqdm = _LazyModule("tqdm")
+zipfile = _LazyModule("zipfile")
+
+
+def __getattr__(name):
+    # BeautifulSoup used to be imported here; keep it importable from this module without loading bs4 eagerly.
+    if name == "BeautifulSoup":
+        from bs4 import BeautifulSoup
+        return BeautifulSoup
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
+
+DownloadResult = collections.namedtuple("DownloadResult", ["spec", "download_url", "result", "error"])
+
+
+def _write_json_atomic(filename, obj):
+    """
+    Writes obj as JSON to a temporary file next to filename and renames it into place, so concurrent readers, also in
+    other processes, see either the old or the new content.
+
+    :param filename: The path + filename of the JSON file.
+    :param obj: The object to serialize.
+    """
+    fd, tmp_filename = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as fileobj:
+            json.dump(obj, fileobj, indent=1, sort_keys=True)
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        os.remove(tmp_filename)
+        raise
+
+
+class InstallMetrics(object):
+    """
+    Timings and counters of one download() or download_and_install() call: the duration of each phase in seconds
+    ("resolve", "verify", "transfer", "extract", "scan" and "link"), the bytes received and the cache hits and misses
+    (archives, install manifests, driver cache and latest versions).
+    """
+
+    def __init__(self, operation=None, version=None):
+        self.operation = operation
+        self.version = version
+        self.phases = collections.OrderedDict()
+        self.bytes_transferred = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.duration = 0.0
+        self.error = None
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Context manager adding the time spent in its block to the named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def add_bytes(self, count):
+        with self._lock:
+            self.bytes_transferred += count
+
+    def cache_hit(self):
+        with self._lock:
+            self.cache_hits += 1
+
+    def cache_miss(self):
+        with self._lock:
+            self.cache_misses += 1
+
+    def as_dict(self):
+        return {"operation": self.operation,
+                "version": self.version,
+                "duration": self.duration,
+                "phases": dict(self.phases),
+                "bytes_transferred": self.bytes_transferred,
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "error": self.error}
+
+    def to_prometheus(self):
+        """
+        Formats the metrics in the Prometheus text exposition format, e.g. for the node_exporter textfile collector.
+
+        :returns: The metrics as a str.
+        """
+        labels = 'operation="{0}",version="{1}"'.format(self.operation, self.version)
+        lines = ["# HELP webdriver_install_duration_seconds Duration of the last driver install.",
+                 "# TYPE webdriver_install_duration_seconds gauge",
+                 "webdriver_install_duration_seconds{{{0}}} {1:.6f}".format(labels, self.duration),
+                 "# HELP webdriver_install_phase_seconds Duration of each phase of the last driver install.",
+                 "# TYPE webdriver_install_phase_seconds gauge"]
+        for name, elapsed in self.phases.items():
+            lines.append('webdriver_install_phase_seconds{{{0},phase="{1}"}} {2:.6f}'.format(labels, name, elapsed))
+        lines += ["# HELP webdriver_install_bytes_transferred Bytes received by the last driver install.",
+                  "# TYPE webdriver_install_bytes_transferred gauge",
+                  "webdriver_install_bytes_transferred{{{0}}} {1}".format(labels, self.bytes_transferred),
+                  "# HELP webdriver_install_cache_hits Cache hits of the last driver install.",
+                  "# TYPE webdriver_install_cache_hits gauge",
+                  "webdriver_install_cache_hits{{{0}}} {1}".format(labels, self.cache_hits),
+                  "# HELP webdriver_install_cache_misses Cache misses of the last driver install.",
+                  "# TYPE webdriver_install_cache_misses gauge",
+                  "webdriver_install_cache_misses{{{0}}} {1}".format(labels, self.cache_misses),
+                  "# HELP webdriver_install_failed Whether the last driver install raised an error.",
+                  "# TYPE webdriver_install_failed gauge",
+                  "webdriver_install_failed{{{0}}} {1}".format(labels, int(self.error is not None))]
+        return "\n".join(lines) + "\n"
+
+
+class _FileLock(object):
+    """
+    Exclusive lock on a lock file, shared by all processes and threads that open the same path.  Used as a context
+    manager; blocks until the lock is acquired.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.fileobj = None
+
+    def __enter__(self):
+        self.fileobj = open(self.filename, mode="a+b")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                while True:
+                    try:
+                        self.fileobj.seek(0)
+                        msvcrt.locking(self.fileobj.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.05)
+            else:
+                import fcntl
+                fcntl.flock(self.fileobj.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            self.fileobj.close()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if os.name == "nt":
+            import msvcrt
+            self.fileobj.seek(0)
+            msvcrt.locking(self.fileobj.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self.fileobj.fileno(), fcntl.LOCK_UN)
+        self.fileobj.close()
+
+
+class _HashingReader(object):
+    """File-like wrapper that hashes, optionally copies and reports every byte read from an HTTP response."""
+
+    def __init__(self, raw, copy_fileobj=None, progress_bar=None, metrics=None):
+        self.raw = raw
+        self.copy_fileobj = copy_fileobj
+        self.progress_bar = progress_bar
+        self.metrics = metrics
+        self.sha256 = hashlib.sha256()
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = self.raw.read(size)
+        if chunk:
+            self.sha256.update(chunk)
+            self.bytes_read += len(chunk)
+            if self.copy_fileobj is not None:
+                self.copy_fileobj.write(chunk)
+            if self.progress_bar is not None:
+                self.progress_bar.update(len(chunk))
+            if self.metrics is not None:
+                self.metrics.add_bytes(len(chunk))
+        return chunk
+
+
 class WebDriverDownloaderBase:
     """Abstract Base Class for the different web driver downloaders
     """
 
     __metaclass__ = abc.ABCMeta
 
-    def __init__(self, download_root=None, link_path=None, os_name=None):
+    def __init__(self, download_root=None, link_path=None, os_name=None, cache_root=None, session=None,
+                 pool_maxsize=10, max_retries=3, backoff_factor=0.5, latest_ttl=3600, stale_while_revalidate=0,
+                 metrics_callback=None, metrics_textfile=None):
         """
-        Initializer for the class.  Accepts three optional parameters.
+        Initializer for the class.  Accepts twelve optional parameters.
 
         :param download_root: Path where the web driver binaries will be downloaded.  If running as root in macOS or
                               Linux, the default will be '/usr/local/webdriver', otherwise will be '$HOME/webdriver'.
@@ -45,6 +249,27 @@ class WebDriverDownloaderBase:
                           Linux, a symlink will be created.
         :param os_name: Name of the OS to download the web driver binary for, as a str.  If not specified, we will use
                         platform.system() to get the OS.
+        :param cache_root: Path of a content-addressed driver cache that can be shared by several download roots.
+                           Archives are extracted once per SHA-256 into the cache and the extracted files are
+                           hardlinked into the download path of each version.  Disabled if not specified.
+        :param session: requests.Session used for every HTTP request made by the downloader, including version
+                        resolution in get_download_url().  If not specified, a pooled session is created with
+                        create_session() on first use.
+        :param pool_maxsize: Number of keep-alive connections kept per host by the default session (default=10).
+                             Should be at least the number of connections used for segmented downloads.
+        :param max_retries: Number of retries for connection errors and 429/5xx responses in the default session
+                            (default=3).
+        :param backoff_factor: Backoff factor between retries in the default session (default=0.5), see
+                               urllib3.util.retry.Retry.
+        :param latest_ttl: Number of seconds (default=3600) a version resolved by get_latest_version() is used from
+                           the on-disk cache before it is revalidated with the server.
+        :param stale_while_revalidate: Number of seconds (default=0) after latest_ttl during which an expired version
+                                       is still returned immediately while it is revalidated in the background.
+        :param metrics_callback: Callable receiving the InstallMetrics of every download() and download_and_install()
+                                 call once it finished.  The metrics of the last call are also kept in
+                                 self.last_metrics.
+        :param metrics_textfile: Path of a file the metrics of the last call are written to in the Prometheus text
+                                 format, e.g. in the directory of the node_exporter textfile collector.
         """
         if os_name is None:
             os_name = platform.system()
@@ -63,13 +288,273 @@ class WebDriverDownloaderBase:
         else:
             self.link_path = link_path
 
+        self.cache_root = cache_root
+        self._session = session
+        self._session_options = {"pool_maxsize": pool_maxsize, "max_retries": max_retries,
+                                 "backoff_factor": backoff_factor}
+        self._session_lock = threading.Lock()
+        self.latest_ttl = latest_ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
+        self.metrics_callback = metrics_callback
+        self.metrics_textfile = metrics_textfile
+        self.last_metrics = None
+        self._metrics_local = threading.local()
+
         if not os.path.isdir(self.download_root):
             os.makedirs(self.download_root)
             logger.info("Created download root directory: {0}".format(self.download_root))
+        if self.cache_root is not None and not os.path.isdir(os.path.join(self.cache_root, "objects")):
+            os.makedirs(os.path.join(self.cache_root, "objects"))
+            logger.info("Created driver cache directory: {0}".format(self.cache_root))
         if not os.path.isdir(self.link_path):
             os.makedirs(self.link_path)
             logger.info("Created symlink directory: {0}".format(self.link_path))
 
+    @property
+    def session(self):
+        """
+        The requests.Session of the downloader.  The default session is created on first use, so installs served
+        from local state never import requests.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self.create_session(**self._session_options)
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    @staticmethod
+    def create_session(pool_maxsize=10, max_retries=3, backoff_factor=0.5):
+        """
+        Method for creating a requests.Session with keep-alive connection pooling and retries with backoff.
+
+        :param pool_maxsize: Number of connections kept per host.
+        :param max_retries: Number of retries for connection errors and 429/5xx responses.
+        :param backoff_factor: Backoff factor between retries, see urllib3.util.retry.Retry.
+        :returns: The configured session.
+        """
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(total=max_retries, backoff_factor=backoff_factor,
+                      status_forcelist=(429, 500, 502, 503, 504), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def get_connection_stats(self):
+        """
+        Method for getting connection pool statistics of the session, to check that connections are reused.
+
+        :returns: Dictionary with the number of "requests" sent, "connections_opened" and "connections_reused" over
+                  all connection pools that are still alive.
+        """
+        connections_opened = 0
+        requests_sent = 0
+        adapters = self._session.adapters.values() if self._session is not None else []
+        for adapter in set(adapters):
+            poolmanager = getattr(adapter, "poolmanager", None)
+            if poolmanager is None:
+                continue
+            for key in poolmanager.pools.keys():
+                pool = poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                connections_opened += pool.num_connections
+                requests_sent += pool.num_requests
+        return {"requests": requests_sent,
+                "connections_opened": connections_opened,
+                "connections_reused": requests_sent - connections_opened}
+
+    @contextlib.contextmanager
+    def _metrics_scope(self, operation, version):
+        """
+        Context manager collecting the metrics of a public call.  Nested calls, e.g. download() inside
+        download_and_install(), add to the metrics of the outermost one, which are reported when it finishes.
+
+        :param operation: Name of the public method.
+        :param version: The version passed to it.
+        """
+        metrics = getattr(self._metrics_local, "metrics", None)
+        if metrics is not None:
+            yield metrics
+            return
+        metrics = InstallMetrics(operation, version)
+        self._metrics_local.metrics = metrics
+        start = time.perf_counter()
+        try:
+            yield metrics
+        except BaseException as exc:
+            metrics.error = repr(exc)
+            raise
+        finally:
+            metrics.duration = time.perf_counter() - start
+            self._metrics_local.metrics = None
+            self.last_metrics = metrics
+            self._report_metrics(metrics)
+
+    def _metrics(self):
+        """
+        Method for getting the metrics of the call in progress in this thread.
+
+        :returns: The current InstallMetrics, or a detached one when called outside of a public call.
+        """
+        return getattr(self._metrics_local, "metrics", None) or InstallMetrics()
+
+    def _report_metrics(self, metrics):
+        """
+        Method for passing finished metrics to the callback and the Prometheus text file.  Errors are logged, not
+        raised, so reporting never fails an install.
+
+        :param metrics: The InstallMetrics of the finished call.
+        """
+        try:
+            if self.metrics_callback is not None:
+                self.metrics_callback(metrics)
+            if self.metrics_textfile is not None:
+                fd, tmp_filename = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.metrics_textfile)),
+                                                    suffix=".tmp")
+                with os.fdopen(fd, "w") as fileobj:
+                    fileobj.write(metrics.to_prometheus())
+                os.replace(tmp_filename, self.metrics_textfile)
+        except Exception:
+            logger.exception("Error reporting install metrics")
+
+    def _resolve_download_url(self, version="latest", os_name=None, bitness=None):
+        """
+        Method calling get_download_url(), timed as the "resolve" phase.
+        """
+        with self._metrics().phase("resolve"):
+            return self.get_download_url(version, os_name=os_name, bitness=bitness)
+
+    def get_latest_version(self, latest_url):
+        """
+        Method for resolving the latest version from an endpoint that returns it as plain text, e.g.
+        https://msedgedriver.azureedge.net/LATEST_STABLE.  Meant to be used by get_download_url() implementations.
+
+        Resolved versions are kept in the "latest" directory of the cache root (or of the download root if there is
+        no cache root), one JSON file per endpoint, shared by all processes using that root.  A version younger than
+        latest_ttl is returned without any network access.  An older one is revalidated with If-None-Match /
+        If-Modified-Since, in the background if it is still within stale_while_revalidate.  If revalidation fails,
+        the expired version is returned with a warning.
+
+        :param latest_url: URL of the endpoint returning the latest version.
+        :returns: The latest version, as a str.
+        """
+        entry_filename, entry = self._read_latest_entry(latest_url)
+        if entry is not None:
+            age = time.time() - entry["fetched_at"]
+            if age < self.latest_ttl:
+                self._metrics().cache_hit()
+                return entry["version"]
+            if age < self.latest_ttl + self.stale_while_revalidate:
+                with self._revalidating_lock:
+                    start_revalidation = latest_url not in self._revalidating
+                    self._revalidating.add(latest_url)
+                if start_revalidation:
+                    threading.Thread(target=self._revalidate_latest_version, args=(latest_url, entry_filename, entry),
+                                     daemon=True).start()
+                return entry["version"]
+        self._metrics().cache_miss()
+        return self._revalidate_latest_version(latest_url, entry_filename, entry)
+
+    def _revalidate_latest_version(self, latest_url, entry_filename, entry=None):
+        """
+        Method for fetching or revalidating the latest version and storing it in the on-disk cache.
+
+        :param latest_url: URL of the endpoint returning the latest version.
+        :param entry_filename: The path + filename of the cache entry.
+        :param entry: The current cache entry, or None.
+        :returns: The latest version, as a str.
+        """
+        try:
+            try:
+                response = self.session.get(latest_url, headers=self._get_revalidation_headers(entry))
+            except requests.RequestException as exc:
+                if entry is None:
+                    raise
+                logger.warning("Could not revalidate {0}, using cached version {1}: {2}".format(
+                    latest_url, entry["version"], exc))
+                return entry["version"]
+            return self._store_latest_entry(latest_url, entry_filename, entry, response.status_code, response.text,
+                                            response.headers)
+        finally:
+            with self._revalidating_lock:
+                self._revalidating.discard(latest_url)
+
+    def _read_latest_entry(self, latest_url):
+        """
+        Method for reading the on-disk cache entry of a latest version endpoint.
+
+        :param latest_url: URL of the endpoint returning the latest version.
+        :returns: Tuple containing [0] the path + filename of the cache entry, and [1] the entry as a dict with the
+                  keys "version", "etag", "last_modified" and "fetched_at", or None if there is none.
+        """
+        entry_filename = os.path.join(self.cache_root or self.download_root, "latest",
+                                      hashlib.sha1(latest_url.encode("utf-8")).hexdigest() + ".json")
+        try:
+            with open(entry_filename, mode="r") as fileobj:
+                return entry_filename, json.load(fileobj)
+        except (IOError, OSError, ValueError):
+            return entry_filename, None
+
+    @staticmethod
+    def _get_revalidation_headers(entry=None):
+        """
+        Method for getting the conditional request headers revalidating a cache entry.
+
+        :param entry: The current cache entry, or None.
+        :returns: Dictionary of headers.
+        """
+        headers = {}
+        if entry is not None and entry.get("etag"):
+            headers['If-None-Match'] = entry["etag"]
+        if entry is not None and entry.get("last_modified"):
+            headers['If-Modified-Since'] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def _store_latest_entry(latest_url, entry_filename, entry, status_code, text, headers):
+        """
+        Method for updating the cache entry of a latest version endpoint from the response to a (conditional)
+        request.
+
+        :param latest_url: URL of the endpoint returning the latest version.
+        :param entry_filename: The path + filename of the cache entry.
+        :param entry: The current cache entry, or None.
+        :param status_code: Status code of the response.
+        :param text: Body of the response, as a str.
+        :param headers: Headers of the response.
+        :returns: The latest version, as a str.
+        """
+        if status_code == 304 and entry is not None:
+            entry["fetched_at"] = time.time()
+        elif status_code == 200:
+            entry = {"version": text.strip(),
+                     "etag": headers.get('ETag'),
+                     "last_modified": headers.get('Last-Modified'),
+                     "fetched_at": time.time()}
+        elif entry is not None:
+            logger.warning("Could not revalidate {0}, got status code {1}, using cached version {2}".format(
+                latest_url, status_code, entry["version"]))
+            return entry["version"]
+        else:
+            error_message = "Error resolving latest version from {0}, got status code: {1}".format(
+                latest_url, status_code)
+            logger.error(error_message)
+            raise RuntimeError(error_message)
+        if not os.path.isdir(os.path.dirname(entry_filename)):
+            os.makedirs(os.path.dirname(entry_filename), exist_ok=True)
+        _write_json_atomic(entry_filename, entry)
+        return entry["version"]
+
     @abc.abstractmethod
     def get_driver_filename(self, os_name=None):
         """
@@ -107,10 +592,14 @@ class WebDriverDownloaderBase:
         :param bitness: Bitness of the web driver binary to download, as a str e.g. "32", "64".  If not specified, we
                         will try to guess the bitness by using util.get_architecture_bitness().
         :returns: The source download URL for the web driver binary.
+
+        Implementations that query the network, e.g. to resolve "latest", should use self.session so the
+        connection is reused by the download, and get_latest_version() for plain text "latest" endpoints.
         """
         raise NotImplementedError
 
-    def download(self, version="latest", os_name=None, bitness=None, show_progress_bar=True):
+    def download(self, version="latest", os_name=None, bitness=None, show_progress_bar=True, connections=1,
+                 expected_sha256=None, verify_existing=False):
         """
         Method for downloading a web driver binary.
 
@@ -118,47 +607,365 @@ class WebDriverDownloaderBase:
                         Default if no version is specified is "latest".  The version string should match the version
                         as specified on the download page of the webdriver binary.  Prior to downloading, the method
                         will check the local filesystem to see if the driver has been downloaded already and will
-                        skip downloading if the file is already present locally.
+                        skip downloading if the file is already present locally.  The file is written to a ".part"
+                        file that is renamed once complete; an interrupted download leaves a checkpoint next to it
+                        and is resumed with a Range request on the next call.  Concurrent downloads of the same file,
+                        also from other processes, wait on a lock file and reuse the file downloaded by the first.
         :param os_name: Name of the OS to download the web driver binary for, as a str.  If not specified, we will use
                         platform.system() to get the OS.
         :param bitness: Bitness of the web driver binary to download, as a str e.g. "32", "64".  If not specified, we
                         will try to guess the bitness by using util.get_architecture_bitness().
         :param show_progress_bar: Boolean (default=True) indicating if a progress bar should be shown in the console.
+        :param connections: Number of concurrent HTTP Range requests used to fetch the file (default=1).  When greater
+                            than 1 and the server advertises "Accept-Ranges: bytes", the file is split into segments
+                            that are downloaded in parallel into a preallocated file.  Otherwise a single stream is
+                            used.
+        :param expected_sha256: Expected SHA-256 hex digest of the file.  The digest of a single stream download is
+                                computed while it is written, so checking it costs no extra read.  A mismatch removes
+                                the file and raises a RuntimeError.  The digest of every download is saved next to the
+                                file as "<file>.sha256".
+        :param verify_existing: Boolean (default=False) indicating if a file already on the filesystem should be
+                                checked against expected_sha256, or its saved digest, before it is reused.  A corrupt
+                                file is downloaded again.
+        :returns: The path + filename to the downloaded web driver binary.
+        """
+        with self._metrics_scope("download", version):
+            return self._download_archive(version, os_name=os_name, bitness=bitness,
+                                          show_progress_bar=show_progress_bar, connections=connections,
+                                          expected_sha256=expected_sha256, verify_existing=verify_existing)
+
+    def _download_archive(self, version="latest", os_name=None, bitness=None, show_progress_bar=True, connections=1,
+                          expected_sha256=None, verify_existing=False, download_url=None):
+        """
+        Method doing the work of download(), see there for the parameters.
+
+        :param download_url: The download URL already resolved by the caller.  If not specified, it is resolved with
+                             get_download_url().
         :returns: The path + filename to the downloaded web driver binary.
         """
-        download_url = self.get_download_url(version, os_name=os_name, bitness=bitness)
+        metrics = self._metrics()
+        if download_url is None:
+            download_url = self._resolve_download_url(version, os_name=os_name, bitness=bitness)
         filename = os.path.split(urlparse(download_url).path)[1]
         filename_with_path = os.path.join(self.get_download_path(version), filename)
         if not os.path.isdir(self.get_download_path(version)):
             os.makedirs(self.get_download_path(version))
-        if os.path.isfile(filename_with_path):
+        verify = verify_existing or expected_sha256 is not None
+        if os.path.isfile(filename_with_path) and self._is_file_intact(filename_with_path, expected_sha256, verify):
             logger.info("Skipping download. File {0} already on filesystem.".format(filename_with_path))
+            metrics.cache_hit()
             return filename_with_path
-        data = requests.get(download_url, stream=True)
-        if data.status_code == 200:
-            logger.debug("Starting download of {0} to {1}".format(download_url, filename_with_path))
-            with open(filename_with_path, mode="wb") as fileobj:
-                chunk_size = 1024
-                if show_progress_bar:
-                    expected_size = int(data.headers['Content-Length'])
-                    for chunk in tqdm.tqdm(data.iter_content(chunk_size),
-                                           total=int(expected_size / chunk_size),
-                                           unit='kb'):
-                        fileobj.write(chunk)
-                else:
-                    for chunk in data.iter_content(chunk_size):
-                        fileobj.write(chunk)
-            logger.debug("Finished downloading {0} to {1}".format(download_url, filename_with_path))
-            return filename_with_path
+        with _FileLock(filename_with_path + ".lock"):
+            if os.path.isfile(filename_with_path):
+                if self._is_file_intact(filename_with_path, expected_sha256, verify):
+                    logger.info("Skipping download. File {0} was downloaded by another installer.".format(
+                        filename_with_path))
+                    metrics.cache_hit()
+                    return filename_with_path
+                logger.warning("File {0} is corrupt and will be downloaded again.".format(filename_with_path))
+                os.remove(filename_with_path)
+            metrics.cache_miss()
+            with metrics.phase("transfer"):
+                self._download_file(download_url, filename_with_path, show_progress_bar, connections,
+                                    expected_sha256)
+        return filename_with_path
+
+    def _download_file(self, download_url, filename_with_path, show_progress_bar=True, connections=1,
+                       expected_sha256=None):
+        """
+        Method for downloading a file through a ".part" file that is renamed once complete.  Must be called with the
+        lock of the file held.
+
+        :param download_url: The source download URL for the web driver binary.
+        :param filename_with_path: The path + filename the file will be written to.
+        :param show_progress_bar: Boolean (default=True) indicating if a progress bar should be shown in the console.
+        :param connections: Number of concurrent HTTP Range requests used to fetch the file (default=1).
+        :param expected_sha256: Expected SHA-256 hex digest of the file, or None.
+        """
+        part_filename = filename_with_path + ".part"
+        checkpoint = self._read_checkpoint(part_filename)
+        sha256 = None
+        if connections > 1 and checkpoint is None:
+            content_length = self._get_ranged_content_length(download_url)
+            if content_length:
+                self._download_segmented(download_url, part_filename, content_length, connections,
+                                         show_progress_bar)
+                # Segments arrive out of order, so they can only be hashed once the file is complete.
+                sha256 = self._hash_file(part_filename)
+            else:
+                logger.info("Server does not accept range requests for {0}, "
+                            "falling back to a single stream.".format(download_url))
+        if sha256 is None:
+            sha256 = self._download_stream(download_url, part_filename, checkpoint, show_progress_bar)
+        if expected_sha256 is not None and sha256 != expected_sha256.lower():
+            os.remove(part_filename)
+            self._remove_checkpoint(part_filename)
+            error_message = "Checksum mismatch for {0}: expected {1}, got {2}".format(download_url, expected_sha256,
+                                                                                     sha256)
+            logger.error(error_message)
+            raise RuntimeError(error_message)
+        self._write_file_digest(filename_with_path, sha256)
+        os.replace(part_filename, filename_with_path)
+        self._remove_checkpoint(part_filename)
+        logger.debug("Finished downloading {0} to {1}".format(download_url, filename_with_path))
+
+    @staticmethod
+    def _read_file_digest(filename_with_path):
+        """
+        Method for reading the SHA-256 saved next to a downloaded file.
+
+        :param filename_with_path: The path + filename of the downloaded file.
+        :returns: The hex digest, or None if none was saved.
+        """
+        try:
+            with open(filename_with_path + ".sha256", mode="r") as fileobj:
+                return fileobj.read().split()[0].lower()
+        except (IOError, OSError, IndexError):
+            return None
+
+    @staticmethod
+    def _write_file_digest(filename_with_path, sha256):
+        """
+        Method for saving the SHA-256 of a downloaded file next to it, in sha256sum format.
+
+        :param filename_with_path: The path + filename of the downloaded file.
+        :param sha256: The hex digest of the file.
+        """
+        with open(filename_with_path + ".sha256", mode="w") as fileobj:
+            fileobj.write("{0}  {1}\n".format(sha256, os.path.basename(filename_with_path)))
+
+    def _is_file_intact(self, filename_with_path, expected_sha256=None, verify=True):
+        """
+        Method for checking a downloaded file against an expected digest, or the digest saved when it was downloaded.
+
+        :param filename_with_path: The path + filename of the downloaded file.
+        :param expected_sha256: Expected SHA-256 hex digest of the file, or None to use the saved digest.
+        :param verify: Boolean (default=True) indicating if the check should be done at all.
+        :returns: False if the file does not match the digest, True otherwise, including when there is no digest.
+        """
+        if not verify:
+            return True
+        expected_sha256 = expected_sha256 or self._read_file_digest(filename_with_path)
+        if expected_sha256 is None:
+            return True
+        with self._metrics().phase("verify"):
+            return self._hash_file(filename_with_path) == expected_sha256.lower()
+
+    @staticmethod
+    def _read_checkpoint(part_filename):
+        """
+        Method for reading the checkpoint of an interrupted download.
+
+        :param part_filename: The path + filename of the partial download.
+        :returns: Dictionary with the keys "bytes_received", "etag" and "last_modified", or None if there is nothing
+                  to resume.  The partial file is truncated to the number of bytes recorded in the checkpoint.
+        """
+        checkpoint_filename = part_filename + ".json"
+        if not os.path.isfile(part_filename) or not os.path.isfile(checkpoint_filename):
+            return None
+        try:
+            with open(checkpoint_filename, mode="r") as fileobj:
+                checkpoint = json.load(fileobj)
+        except ValueError:
+            logger.warning("Ignoring corrupt download checkpoint {0}".format(checkpoint_filename))
+            return None
+        bytes_received = min(int(checkpoint.get("bytes_received", 0)), os.path.getsize(part_filename))
+        if bytes_received <= 0 or not (checkpoint.get("etag") or checkpoint.get("last_modified")):
+            return None
+        with open(part_filename, mode="r+b") as fileobj:
+            fileobj.truncate(bytes_received)
+        checkpoint["bytes_received"] = bytes_received
+        return checkpoint
+
+    @staticmethod
+    def _write_checkpoint(part_filename, checkpoint):
+        """
+        Method for atomically saving the checkpoint of a download in progress next to the partial file.
+
+        :param part_filename: The path + filename of the partial download.
+        :param checkpoint: Dictionary with the keys "bytes_received", "etag" and "last_modified".
+        """
+        _write_json_atomic(part_filename + ".json", checkpoint)
+
+    @staticmethod
+    def _remove_checkpoint(part_filename):
+        """
+        Method for removing the checkpoint of a finished download.
+
+        :param part_filename: The path + filename of the partial download.
+        """
+        checkpoint_filename = part_filename + ".json"
+        if os.path.isfile(checkpoint_filename):
+            os.remove(checkpoint_filename)
+
+    def _download_stream(self, download_url, part_filename, checkpoint=None, show_progress_bar=True):
+        """
+        Method for downloading a file as a single stream into a partial file, resuming from a checkpoint if possible.
+
+        The checkpoint is refreshed every megabyte and when the transfer is interrupted, so a later call can continue
+        with a Range request.  The server validators (ETag/Last-Modified) are sent back in an If-Range header; if the
+        file changed on the server, it answers with the full content and the download starts over.
+
+        :param download_url: The source download URL for the web driver binary.
+        :param part_filename: The path + filename of the partial download.
+        :param checkpoint: Checkpoint returned by _read_checkpoint(), or None to start from scratch.
+        :param show_progress_bar: Boolean (default=True) indicating if a progress bar should be shown in the console.
+        :returns: The SHA-256 hex digest of the file, computed while it is written.  When resuming, only the part
+                  already on disk is read back.
+        """
+        headers = {}
+        if checkpoint is not None:
+            headers['Range'] = 'bytes={0}-'.format(checkpoint["bytes_received"])
+            headers['If-Range'] = checkpoint.get("etag") or checkpoint["last_modified"]
+        data = self.session.get(download_url, headers=headers, stream=True)
+        if data.status_code == 206 and checkpoint is not None:
+            bytes_received = checkpoint["bytes_received"]
+            logger.info("Resuming download of {0} at byte {1}".format(download_url, bytes_received))
+            mode = "ab"
+        elif data.status_code == 200:
+            bytes_received = 0
+            mode = "wb"
         else:
+            data.close()
+            filename = os.path.split(urlparse(download_url).path)[1]
             error_message = "Error downloading file {0}, got status code: {1}".format(filename, data.status_code)
             logger.error(error_message)
             raise RuntimeError(error_message)
+        checkpoint = {"bytes_received": bytes_received,
+                      "etag": data.headers.get('ETag'),
+                      "last_modified": data.headers.get('Last-Modified')}
+        resumable = bool(checkpoint["etag"] or checkpoint["last_modified"])
+        start_offset = bytes_received
+        metrics = self._metrics()
+        sha256 = hashlib.sha256()
+        if start_offset:
+            self._hash_file(part_filename, sha256)
+        logger.debug("Starting download of {0} to {1}".format(download_url, part_filename))
+        progress_bar = None
+        if show_progress_bar:
+            progress_bar = tqdm.tqdm(total=int(data.headers.get('Content-Length', 0)) or None, unit='B',
+                                     unit_scale=True)
+        with open(part_filename, mode=mode) as fileobj:
+            chunk_size = 256 * 1024
+            checkpoint_interval = 1024 * 1024
+            next_checkpoint = bytes_received + checkpoint_interval
+            try:
+                for chunk in data.iter_content(chunk_size):
+                    fileobj.write(chunk)
+                    sha256.update(chunk)
+                    bytes_received += len(chunk)
+                    metrics.add_bytes(len(chunk))
+                    if progress_bar is not None:
+                        progress_bar.update(len(chunk))
+                    if resumable and bytes_received >= next_checkpoint:
+                        fileobj.flush()
+                        checkpoint["bytes_received"] = bytes_received
+                        self._write_checkpoint(part_filename, checkpoint)
+                        next_checkpoint = bytes_received + checkpoint_interval
+            except BaseException:
+                if resumable:
+                    fileobj.flush()
+                    checkpoint["bytes_received"] = bytes_received
+                    self._write_checkpoint(part_filename, checkpoint)
+                    logger.warning("Download of {0} interrupted after {1} bytes, "
+                                   "checkpoint saved".format(download_url, bytes_received))
+                raise
+            finally:
+                if progress_bar is not None:
+                    progress_bar.close()
+        expected_length = data.headers.get('Content-Length')
+        if expected_length is not None and 'Content-Encoding' not in data.headers \
+                and bytes_received - start_offset < int(expected_length):
+            if resumable:
+                checkpoint["bytes_received"] = bytes_received
+                self._write_checkpoint(part_filename, checkpoint)
+            error_message = "Incomplete download of {0}: received {1} of {2} bytes".format(
+                download_url, bytes_received - start_offset, expected_length)
+            logger.error(error_message)
+            raise RuntimeError(error_message)
+        return sha256.hexdigest()
+
+    def _get_ranged_content_length(self, download_url):
+        """
+        Method for checking whether a download URL can be fetched with HTTP Range requests.
+
+        :param download_url: The source download URL for the web driver binary.
+        :returns: The size of the file in bytes if the server advertises "Accept-Ranges: bytes" and a Content-Length,
+                  otherwise None.
+        """
+        head = self.session.head(download_url, allow_redirects=True)
+        if head.status_code != 200:
+            return None
+        if head.headers.get('Accept-Ranges', '').lower() != 'bytes':
+            return None
+        content_length = int(head.headers.get('Content-Length', 0))
+        return content_length or None
+
+    def _download_segmented(self, download_url, filename_with_path, content_length, connections,
+                            show_progress_bar=True):
+        """
+        Method for downloading a file as concurrent HTTP Range requests into a preallocated file.
+
+        :param download_url: The source download URL for the web driver binary.
+        :param filename_with_path: The path + filename the file will be written to.
+        :param content_length: Size of the file in bytes.
+        :param connections: Number of segments downloaded concurrently.
+        :param show_progress_bar: Boolean (default=True) indicating if a progress bar should be shown in the console.
+        """
+        segment_size = -(-content_length // connections)
+        segments = [(start, min(start + segment_size, content_length) - 1)
+                    for start in range(0, content_length, segment_size)]
+        logger.debug("Starting download of {0} to {1} in {2} segments".format(download_url, filename_with_path,
+                                                                              len(segments)))
+        with open(filename_with_path, mode="wb") as fileobj:
+            fileobj.truncate(content_length)
+        progress_bar = tqdm.tqdm(total=content_length, unit='B', unit_scale=True) if show_progress_bar else None
+        progress_lock = threading.Lock()
+        metrics = self._metrics()
+
+        def fetch_segment(segment):
+            start, end = segment
+            data = self.session.get(download_url, headers={'Range': 'bytes={0}-{1}'.format(start, end)}, stream=True)
+            if data.status_code != 206:
+                data.close()
+                raise RuntimeError("Error downloading bytes {0}-{1} of {2}, got status code: {3}".format(
+                    start, end, download_url, data.status_code))
+            received = 0
+            with open(filename_with_path, mode="r+b") as segment_fileobj:
+                segment_fileobj.seek(start)
+                for chunk in data.iter_content(64 * 1024):
+                    segment_fileobj.write(chunk)
+                    received += len(chunk)
+                    metrics.add_bytes(len(chunk))
+                    if progress_bar is not None:
+                        with progress_lock:
+                            progress_bar.update(len(chunk))
+            if received != end - start + 1:
+                raise RuntimeError("Incomplete segment {0}-{1} of {2}: received {3} bytes".format(
+                    start, end, download_url, received))
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=connections) as executor:
+                for future in concurrent.futures.as_completed([executor.submit(fetch_segment, segment)
+                                                               for segment in segments]):
+                    future.result()
+        except Exception as exc:
+            os.remove(filename_with_path)
+            logger.error(str(exc))
+            raise
+        finally:
+            if progress_bar is not None:
+                progress_bar.close()
+        logger.debug("Finished downloading {0} to {1}".format(download_url, filename_with_path))
 
-    def download_and_install(self, version="latest", os_name=None, bitness=None, show_progress_bar=True, extract_path=''):
+    def download_and_install(self, version="latest", os_name=None, bitness=None, show_progress_bar=True, extract_path='',
+                             stream_extract=False, keep_archive=False, extract_driver_only=False, verify_archive=True):
         """
         Method for downloading a web driver binary, extracting it into the download directory and creating a symlink
-        to the binary in the link directory.
+        to the binary in the link directory.  When a cache_root was given, the extracted files are hardlinked from
+        the driver cache instead, and versions already known to the cache are installed without downloading.
+        Otherwise the extracted binary is recorded in an install manifest in the download path, so later calls, also
+        from other processes, reuse it without downloading, opening the archive or scanning directories.
 
         :param version: String representing the version of the web driver binary to download.  For example, "2.38".
                         Default if no version is specified is "latest".  The version string should match the version
@@ -168,39 +975,328 @@ class WebDriverDownloaderBase:
         :param bitness: Bitness of the web driver binary to download, as a str e.g. "32", "64".  If not specified, we
                         will try to guess the bitness by using util.get_architecture_bitness().
         :param show_progress_bar: Boolean (default=True) indicating if a progress bar should be shown in the console.
+        :param extract_path: Directory the archive is extracted to and searched for the binary.  Defaults to a
+                             directory named after the archive in the download path.
+        :param stream_extract: Boolean (default=False) indicating if .tar.gz archives that are not on the filesystem
+                               yet should be extracted while they are downloaded, instead of being read again from
+                               disk after the download.  Zip archives are always extracted after the download.
+        :param keep_archive: Boolean (default=False) indicating if a streamed archive should also be written to the
+                             download path.  Only used with stream_extract.
+        :param extract_driver_only: Boolean (default=False) indicating if only the binary should be extracted, looked
+                                    up in the archive index instead of searched for on the filesystem.
+        :param verify_archive: Boolean (default=True) indicating if an archive already on the filesystem is checked
+                               against its saved digest before it is used.  The caller may pass False for an archive
+                               it has just downloaded and verified itself, to avoid reading it twice.
         :returns: Tuple containing the path + filename to [0] the extracted binary, and [1] the symlink to the
                   extracted binary.
         """
-        filename_with_path = self.download(version,
-                                           os_name=os_name,
-                                           bitness=bitness,
-                                           show_progress_bar=show_progress_bar)
-        filename = os.path.split(filename_with_path)[1]
-        if filename.lower().endswith(".tar.gz"):
-            extract_dir = os.path.join(self.get_download_path(version), filename[:-7])
-        elif filename.lower().endswith(".zip"):
-            extract_dir = os.path.join(self.get_download_path(version), filename[:-4])
+        with self._metrics_scope("download_and_install", version):
+            actual_driver_filename = self._extract_driver(version, os_name=os_name, bitness=bitness,
+                                                          show_progress_bar=show_progress_bar,
+                                                          extract_path=extract_path, stream_extract=stream_extract,
+                                                          keep_archive=keep_archive,
+                                                          extract_driver_only=extract_driver_only,
+                                                          verify_archive=verify_archive)
+            return self._link_driver(actual_driver_filename, os_name=os_name)
+
+    def download_many(self, specs, max_workers=4, show_progress_bar=True, install=True, **kwargs):
+        """
+        Method for downloading and extracting several web driver binaries concurrently.
+
+        Download URLs are resolved first and specs resolving to the same URL are only downloaded once.  Downloads and
+        extractions run on a pool of max_workers threads; the links are then created one spec at a time in the order
+        given, so when several specs share a link the last one wins.
+
+        :param specs: Iterable of (version, os_name, bitness) tuples.  os_name and bitness may be left out or None.
+        :param max_workers: Maximum number of concurrent downloads (default=4).
+        :param show_progress_bar: Boolean (default=True) indicating if a single progress bar over all downloads
+                                  should be shown in the console.
+        :param install: Boolean (default=True) indicating if the binaries should be linked like download_and_install()
+                        does.  If False, the result of each spec is the path + filename of the extracted binary.
+        :param kwargs: Additional keyword arguments for download_and_install(), e.g. stream_extract.
+        :returns: List of DownloadResult(spec, download_url, result, error) in the order of specs.  result is what
+                  download_and_install() returns for the spec and error the exception raised for it, if any.
+        """
+        specs = [tuple(spec) + (None,) * (3 - len(spec)) for spec in specs]
+        download_urls = []
+        errors = {}
+        for index, (version, os_name, bitness) in enumerate(specs):
+            try:
+                download_urls.append(self._resolve_download_url(version, os_name=os_name, bitness=bitness))
+            except Exception as exc:
+                logger.error("Error resolving download URL for {0}: {1}".format(specs[index], exc))
+                download_urls.append(None)
+                errors[index] = exc
+        first_index_by_url = collections.OrderedDict()
+        for index, download_url in enumerate(download_urls):
+            if download_url is not None and download_url not in first_index_by_url:
+                first_index_by_url[download_url] = index
+
+        extracted = {}
+        progress_bar = tqdm.tqdm(total=len(first_index_by_url), unit='driver') if show_progress_bar else None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_url = {}
+            for download_url, index in first_index_by_url.items():
+                version, os_name, bitness = specs[index]
+                future = executor.submit(self._extract_driver, version, os_name=os_name, bitness=bitness,
+                                         show_progress_bar=False, download_url=download_url, **kwargs)
+                future_to_url[future] = download_url
+            for future in concurrent.futures.as_completed(future_to_url):
+                download_url = future_to_url[future]
+                try:
+                    extracted[download_url] = (future.result(), None)
+                except Exception as exc:
+                    logger.error("Error downloading {0}: {1}".format(download_url, exc))
+                    extracted[download_url] = (None, exc)
+                if progress_bar is not None:
+                    progress_bar.update(1)
+        if progress_bar is not None:
+            progress_bar.close()
+
+        results = []
+        for index, spec in enumerate(specs):
+            download_url = download_urls[index]
+            if download_url is None:
+                results.append(DownloadResult(spec, None, None, errors[index]))
+                continue
+            actual_driver_filename, error = extracted[download_url]
+            result = actual_driver_filename
+            if error is None and install:
+                try:
+                    result = self._link_driver(actual_driver_filename, os_name=spec[1])
+                except Exception as exc:
+                    logger.error("Error installing {0}: {1}".format(actual_driver_filename, exc))
+                    result, error = None, exc
+            results.append(DownloadResult(spec, download_url, result if error is None else None, error))
+        return results
+
+    def _extract_driver(self, version="latest", os_name=None, bitness=None, show_progress_bar=True, extract_path='',
+                        stream_extract=False, keep_archive=False, extract_driver_only=False, download_url=None,
+                        verify_archive=True):
+        """
+        Method for downloading and extracting a web driver binary, without linking it.  See download_and_install()
+        for the parameters.  The download URL is resolved once here and passed down, so an install calls
+        get_download_url() once and the lock, manifest, cache index and archive all refer to the same URL even if
+        "latest" changes meanwhile.
+
+        :param download_url: The download URL already resolved by the caller, e.g. download_many().
+        :returns: The path + filename of the extracted binary.
+        """
+        with self._metrics_scope("download_and_install", version):
+            if download_url is None:
+                download_url = self._resolve_download_url(version, os_name=os_name, bitness=bitness)
+            filename = os.path.split(urlparse(download_url).path)[1]
+            if not os.path.isdir(self.get_download_path(version)):
+                os.makedirs(self.get_download_path(version), exist_ok=True)
+            with _FileLock(os.path.join(self.get_download_path(version), filename + ".install.lock")):
+                return self._extract_driver_locked(version, os_name=os_name, bitness=bitness,
+                                                   show_progress_bar=show_progress_bar, extract_path=extract_path,
+                                                   stream_extract=stream_extract, keep_archive=keep_archive,
+                                                   extract_driver_only=extract_driver_only,
+                                                   download_url=download_url, verify_archive=verify_archive)
+
+    def _extract_driver_locked(self, version="latest", os_name=None, bitness=None, show_progress_bar=True,
+                               extract_path='', stream_extract=False, keep_archive=False, extract_driver_only=False,
+                               download_url=None, verify_archive=True):
+        """
+        Method doing the work of _extract_driver() with the install lock of the version and archive held, so only
+        one installer, in any process, extracts it at a time.
+
+        :param download_url: The download URL resolved by _extract_driver().
+        :returns: The path + filename of the extracted binary.
+        """
+        metrics = self._metrics()
+        driver_filename = self.get_driver_filename(os_name=os_name)
+        if download_url is None:
+            download_url = self._resolve_download_url(version, os_name=os_name, bitness=bitness)
+        if self.cache_root is None:
+            manifest_key = self._get_manifest_key(download_url, os_name=os_name)
+            actual_driver_filename = self._load_install_manifest(version).get(manifest_key)
+            if actual_driver_filename is not None and os.path.isfile(actual_driver_filename):
+                logger.debug("Found {0} in install manifest: {1}".format(driver_filename, actual_driver_filename))
+                metrics.cache_hit()
+                return actual_driver_filename
+            metrics.cache_miss()
+        if self.cache_root is not None:
+            extract_path = self._install_from_cache(version, os_name=os_name, bitness=bitness,
+                                                    show_progress_bar=show_progress_bar,
+                                                    stream_extract=stream_extract, keep_archive=keep_archive,
+                                                    download_url=download_url, verify_archive=verify_archive)
+        elif extract_driver_only:
+            actual_driver_filename = self._extract_driver_member(version, os_name=os_name, bitness=bitness,
+                                                                 show_progress_bar=show_progress_bar,
+                                                                 extract_path=extract_path, download_url=download_url,
+                                                                 verify_archive=verify_archive)
+            self._record_install_manifest(version, manifest_key, actual_driver_filename)
+            return actual_driver_filename
+        elif stream_extract and self._can_stream_extract(version, download_url=download_url):
+            filename = os.path.split(urlparse(download_url).path)[1]
+            extract_dir = os.path.join(self.get_download_path(version), self._get_extract_dirname(filename))
+            archive_filename = os.path.join(self.get_download_path(version), filename) if keep_archive else None
+            with metrics.phase("transfer"):
+                self._download_and_extract(download_url, extract_dir, archive_filename, show_progress_bar)
+            extract_path = extract_dir
         else:
-            error_message = "Unknown archive format: {0}".format(filename)
+            filename_with_path = self._download_archive(version,
+                                                        os_name=os_name,
+                                                        bitness=bitness,
+                                                        show_progress_bar=show_progress_bar,
+                                                        verify_existing=verify_archive,
+                                                        download_url=download_url)
+            filename = os.path.split(filename_with_path)[1]
+            if not extract_path:
+                extract_path = os.path.join(self.get_download_path(version), self._get_extract_dirname(filename))
+            if not os.path.isdir(extract_path):
+                os.makedirs(extract_path)
+                logger.debug("Created directory: {0}".format(extract_path))
+            with metrics.phase("extract"):
+                if filename.lower().endswith(".tar.gz"):
+                    with tarfile.open(os.path.join(self.get_download_path(version), filename), mode="r:*") as tar:
+                        tar.extractall(extract_path)
+                        logger.debug("Extracted files: {0}".format(", ".join(tar.getnames())))
+                elif filename.lower().endswith(".zip"):
+                    with zipfile.ZipFile(os.path.join(self.get_download_path(version), filename),
+                                         mode="r") as driver_zipfile:
+                        driver_zipfile.extractall(extract_path)
+        actual_driver_filename = None
+        with metrics.phase("scan"):
+            for root, dirs, files in os.walk(extract_path):
+                for curr_file in files:
+                    if curr_file == driver_filename:
+                        actual_driver_filename = os.path.join(root, curr_file)
+                        break
+        if actual_driver_filename is None:
+            error_message = "Driver {0} not found in {1}".format(driver_filename, extract_path)
             logger.error(error_message)
             raise RuntimeError(error_message)
-        if not os.path.isdir(extract_dir):
-            os.makedirs(extract_dir)
-            logger.debug("Created directory: {0}".format(extract_dir))
-        if filename.lower().endswith(".tar.gz"):
-            with tarfile.open(os.path.join(self.get_download_path(version), filename), mode="r:*") as tar:
-                tar.extractall(extract_dir)
-                logger.debug("Extracted files: {0}".format(", ".join(tar.getnames())))
-        elif filename.lower().endswith(".zip"):
-            with zipfile.ZipFile(os.path.join(self.get_download_path(version), filename), mode="r") as driver_zipfile:
-                driver_zipfile.extractall(extract_path)
-                #driver_zipfile.extractall(extract_dir)
+        if self.cache_root is None:
+            self._record_install_manifest(version, manifest_key, actual_driver_filename)
+        return actual_driver_filename
+
+    def _get_manifest_key(self, download_url, os_name=None):
+        """
+        Method for getting the install manifest key of a binary: "<archive>:<driver filename>".
+
+        :param download_url: The source download URL for the web driver binary.
+        :param os_name: Name of the OS the web driver binary is for, as a str.
+        :returns: The key, as a str.
+        """
+        return "{0}:{1}".format(os.path.split(urlparse(download_url).path)[1], self.get_driver_filename(os_name=os_name))
+
+    def _is_installable_offline(self, version, download_url, os_name=None):
+        """
+        Method for checking whether a binary can be installed without its archive: the driver cache knows the
+        download URL, or the install manifest of the download path has the extracted binary.
+
+        :param version: String representing the version of the web driver binary.
+        :param download_url: The source download URL for the web driver binary.
+        :param os_name: Name of the OS the web driver binary is for, as a str.
+        :returns: True if _extract_driver() would neither download nor read the archive.
+        """
+        if self.cache_root is not None:
+            archive_hash = self._load_cache_index().get(download_url)
+            return archive_hash is not None and os.path.isdir(os.path.join(self.cache_root, "objects", archive_hash))
+        actual_driver_filename = self._load_install_manifest(version).get(self._get_manifest_key(download_url,
+                                                                                                 os_name=os_name))
+        return actual_driver_filename is not None and os.path.isfile(actual_driver_filename)
+
+    def _load_install_manifest(self, version="latest"):
+        """
+        Method for loading the install manifest of a download path, which maps "<archive>:<driver filename>" to the
+        path + filename of the extracted binary.
+
+        :param version: String representing the version of the web driver binary.
+        :returns: The manifest as a dict.
+        """
+        manifest_filename = os.path.join(self.get_download_path(version), "install_manifest.json")
+        try:
+            with open(manifest_filename, mode="r") as fileobj:
+                return json.load(fileobj)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _record_install_manifest(self, version, manifest_key, actual_driver_filename):
+        """
+        Method for recording an extracted binary in the install manifest of a download path.
+
+        :param version: String representing the version of the web driver binary.
+        :param manifest_key: "<archive>:<driver filename>" key of the binary.
+        :param actual_driver_filename: The path + filename of the extracted binary.
+        """
+        manifest = self._load_install_manifest(version)
+        manifest[manifest_key] = os.path.abspath(actual_driver_filename)
+        _write_json_atomic(os.path.join(self.get_download_path(version), "install_manifest.json"), manifest)
+
+    def _extract_driver_member(self, version="latest", os_name=None, bitness=None, show_progress_bar=True,
+                               extract_path='', download_url=None, verify_archive=True):
+        """
+        Method for extracting only the web driver binary from its archive, found through the archive index instead
+        of a directory scan.
+
+        :param version: String representing the version of the web driver binary to download.
+        :param os_name: Name of the OS to download the web driver binary for, as a str.
+        :param bitness: Bitness of the web driver binary to download, as a str e.g. "32", "64".
+        :param show_progress_bar: Boolean (default=True) indicating if a progress bar should be shown in the console.
+        :param extract_path: Directory the binary is extracted to, defaults to a directory named after the archive
+                             in the download path.
+        :param download_url: The download URL already resolved by the caller.  If not specified, it is resolved with
+                             get_download_url().
+        :param verify_archive: Boolean (default=True) indicating if an archive already on the filesystem is checked
+                               against its saved digest.
+        :returns: The path + filename of the extracted binary.
+        """
+        if download_url is None:
+            download_url = self._resolve_download_url(version, os_name=os_name, bitness=bitness)
+        filename = os.path.split(urlparse(download_url).path)[1]
         driver_filename = self.get_driver_filename(os_name=os_name)
-        for root, dirs, files in os.walk(extract_path):
-            for curr_file in files:
-                if curr_file == driver_filename:
-                    actual_driver_filename = os.path.join(root, curr_file)
-                    break
+        filename_with_path = self._download_archive(version, os_name=os_name, bitness=bitness,
+                                                    show_progress_bar=show_progress_bar,
+                                                    verify_existing=verify_archive, download_url=download_url)
+        if not extract_path:
+            extract_path = os.path.join(self.get_download_path(version), self._get_extract_dirname(filename))
+        with self._metrics().phase("extract"):
+            if filename.lower().endswith(".tar.gz"):
+                with tarfile.open(filename_with_path, mode="r:*") as tar:
+                    for member in tar:
+                        if member.isfile() and os.path.basename(member.name) == driver_filename:
+                            tar.extract(member, extract_path)
+                            member_name = member.name
+                            break
+                    else:
+                        member_name = None
+            else:
+                with zipfile.ZipFile(filename_with_path, mode="r") as driver_zipfile:
+                    member_name = next((name for name in driver_zipfile.namelist()
+                                        if not name.endswith("/") and os.path.basename(name) == driver_filename), None)
+                    if member_name is not None:
+                        driver_zipfile.extract(member_name, extract_path)
+        if member_name is None:
+            error_message = "Driver {0} not found in {1}".format(driver_filename, filename_with_path)
+            logger.error(error_message)
+            raise RuntimeError(error_message)
+        actual_driver_filename = os.path.join(extract_path, *member_name.split("/"))
+        logger.debug("Extracted {0} from {1}".format(member_name, filename))
+        return actual_driver_filename
+
+    def _link_driver(self, actual_driver_filename, os_name=None):
+        """
+        Method for creating the symlink (macOS and Linux) or copy (Windows) of an extracted web driver binary in the
+        link directory.
+
+        :param actual_driver_filename: The path + filename of the extracted binary.
+        :param os_name: Name of the OS the web driver binary is for, as a str.  If not specified, we will use
+                        platform.system() to get the OS.
+        :returns: Tuple containing the path + filename to [0] the extracted binary, and [1] the symlink to the
+                  extracted binary.
+        """
+        with self._metrics().phase("link"):
+            return self._create_link(actual_driver_filename, os_name=os_name)
+
+    def _create_link(self, actual_driver_filename, os_name=None):
+        """
+        Method doing the work of _link_driver(), see there for the parameters.
+        """
+        driver_filename = os.path.basename(actual_driver_filename)
         if os_name is None:
             os_name = platform.system()
         if os_name in ['Darwin', 'Linux']:
@@ -212,8 +1308,11 @@ class WebDriverDownloaderBase:
                     return tuple([symlink_src, symlink_target])
                 else:
                     logger.warning("Symlink {0} already exists and will be overwritten.".format(symlink_target))
-                    os.unlink(symlink_target)
-            os.symlink(symlink_src, symlink_target)
+            # Create the link under a temporary name and rename it over the target, so concurrent installers never
+            # see a missing link or fail on an existing one.
+            tmp_symlink_target = "{0}.{1}.{2}.tmp".format(symlink_target, os.getpid(), threading.get_ident())
+            os.symlink(symlink_src, tmp_symlink_target)
+            os.replace(tmp_symlink_target, symlink_target)
             logger.info("Created symlink: {0} -> {1}".format(symlink_target, symlink_src))
             st = os.stat(symlink_src)
             os.chmod(symlink_src, st.st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
@@ -224,4 +1323,245 @@ class WebDriverDownloaderBase:
             if os.path.isfile(dest_file):
                 logger.info("File {0} already exists and will be overwritten.".format(dest_file))
             shutil.copy2(src_file, dest_file)
-            return tuple([src_file, dest_file])
\ No newline at end of file
+            return tuple([src_file, dest_file])
+
+    @staticmethod
+    def _get_extract_dirname(filename):
+        """
+        Method for getting the name of the directory an archive is extracted to.
+
+        :param filename: Filename of the downloaded archive.
+        :returns: The filename without the archive extension.
+        """
+        if filename.lower().endswith(".tar.gz"):
+            return filename[:-7]
+        elif filename.lower().endswith(".zip"):
+            return filename[:-4]
+        error_message = "Unknown archive format: {0}".format(filename)
+        logger.error(error_message)
+        raise RuntimeError(error_message)
+
+    @staticmethod
+    def _hash_file(filename_with_path, sha256=None):
+        """
+        Method for computing the SHA-256 of a file.
+
+        :param filename_with_path: The path + filename of the file.
+        :param sha256: hashlib object to update with the file contents, a new one if not specified.
+        :returns: The hex digest of the file contents.
+        """
+        if sha256 is None:
+            sha256 = hashlib.sha256()
+        buffer = bytearray(1024 * 1024)
+        view = memoryview(buffer)
+        with open(filename_with_path, mode="rb", buffering=0) as fileobj:
+            for size in iter(lambda: fileobj.readinto(buffer), 0):
+                sha256.update(view[:size])
+        return sha256.hexdigest()
+
+    def _load_cache_index(self):
+        """
+        Method for loading the index of the driver cache, which maps download URLs to archive digests.
+
+        :returns: The index as a dict.
+        """
+        index_filename = os.path.join(self.cache_root, "index.json")
+        if not os.path.isfile(index_filename):
+            return {}
+        try:
+            with open(index_filename, mode="r") as fileobj:
+                return json.load(fileobj)
+        except ValueError:
+            logger.warning("Ignoring corrupt driver cache index {0}".format(index_filename))
+            return {}
+
+    def _save_cache_index(self, download_url, archive_hash):
+        """
+        Method for recording the archive digest of a download URL in the index of the driver cache.
+
+        :param download_url: The source download URL for the web driver binary.
+        :param archive_hash: The SHA-256 hex digest of the archive.
+        """
+        with _FileLock(os.path.join(self.cache_root, "index.json.lock")):
+            index = self._load_cache_index()
+            index[download_url] = archive_hash
+            _write_json_atomic(os.path.join(self.cache_root, "index.json"), index)
+
+    @staticmethod
+    def _link_tree(src_dir, dest_dir):
+        """
+        Method for mirroring a directory tree with hardlinks.  Files are copied when hardlinks are not possible, e.g.
+        across filesystems.
+
+        :param src_dir: The directory to mirror.
+        :param dest_dir: The directory the links are created in.
+        """
+        for root, dirs, files in os.walk(src_dir):
+            target_root = os.path.join(dest_dir, os.path.relpath(root, src_dir))
+            if not os.path.isdir(target_root):
+                os.makedirs(target_root)
+            for curr_file in files:
+                src_file = os.path.join(root, curr_file)
+                target_file = os.path.join(target_root, curr_file)
+                if os.path.exists(target_file):
+                    if os.path.samefile(src_file, target_file):
+                        continue
+                    os.remove(target_file)
+                try:
+                    os.link(src_file, target_file)
+                except OSError:
+                    shutil.copy2(src_file, target_file)
+
+    def _install_from_cache(self, version="latest", os_name=None, bitness=None, show_progress_bar=True,
+                            stream_extract=False, keep_archive=False, download_url=None, verify_archive=True):
+        """
+        Method for populating the download path of a version from the driver cache.  The archive is only downloaded
+        and extracted when its download URL is not yet known to the cache; otherwise the cached files are linked
+        into place without any network or archive access.
+
+        :param version: String representing the version of the web driver binary to download.
+        :param os_name: Name of the OS to download the web driver binary for, as a str.
+        :param bitness: Bitness of the web driver binary to download, as a str e.g. "32", "64".
+        :param show_progress_bar: Boolean (default=True) indicating if a progress bar should be shown in the console.
+        :param stream_extract: Boolean (default=False) indicating if a .tar.gz archive should be extracted while it
+                               is downloaded.
+        :param keep_archive: Boolean (default=False) indicating if a streamed archive should also be written to the
+                             download path.
+        :param download_url: The download URL already resolved by the caller.  If not specified, it is resolved with
+                             get_download_url().
+        :param verify_archive: Boolean (default=True) indicating if an archive already on the filesystem is checked
+                               against its saved digest.
+        :returns: The directory the cached files were linked into.
+        """
+        if download_url is None:
+            download_url = self._resolve_download_url(version, os_name=os_name, bitness=bitness)
+        filename = os.path.split(urlparse(download_url).path)[1]
+        extract_dir = os.path.join(self.get_download_path(version), self._get_extract_dirname(filename))
+        metrics = self._metrics()
+        archive_hash = self._load_cache_index().get(download_url)
+        object_dir = os.path.join(self.cache_root, "objects", archive_hash) if archive_hash else None
+        if object_dir is not None and os.path.isdir(object_dir):
+            logger.info("Driver cache hit for {0}: {1}".format(download_url, archive_hash))
+            metrics.cache_hit()
+        elif stream_extract and self._can_stream_extract(version, download_url=download_url):
+            metrics.cache_miss()
+            # Unique per call: threads of one process may stream different versions of the same archive name.
+            tmp_dir = tempfile.mkdtemp(dir=os.path.join(self.cache_root, "objects"), suffix=".tmp")
+            archive_filename = os.path.join(self.get_download_path(version), filename) if keep_archive else None
+            try:
+                with metrics.phase("transfer"):
+                    archive_hash = self._download_and_extract(download_url, tmp_dir, archive_filename,
+                                                              show_progress_bar)
+            except BaseException:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+            object_dir = os.path.join(self.cache_root, "objects", archive_hash)
+            try:
+                os.rename(tmp_dir, object_dir)
+                logger.debug("Added {0} to the driver cache as {1}".format(filename, archive_hash))
+            except OSError:
+                # Another installer added the same archive first.
+                shutil.rmtree(tmp_dir)
+            self._save_cache_index(download_url, archive_hash)
+        else:
+            metrics.cache_miss()
+            filename_with_path = self._download_archive(version, os_name=os_name, bitness=bitness,
+                                                        show_progress_bar=show_progress_bar,
+                                                        verify_existing=verify_archive, download_url=download_url)
+            archive_hash = self._read_file_digest(filename_with_path) or self._hash_file(filename_with_path)
+            object_dir = os.path.join(self.cache_root, "objects", archive_hash)
+            if not os.path.isdir(object_dir):
+                tmp_dir = tempfile.mkdtemp(dir=os.path.join(self.cache_root, "objects"), suffix=".tmp")
+                with metrics.phase("extract"):
+                    if filename.lower().endswith(".tar.gz"):
+                        with tarfile.open(filename_with_path, mode="r:*") as tar:
+                            tar.extractall(tmp_dir)
+                    else:
+                        with zipfile.ZipFile(filename_with_path, mode="r") as driver_zipfile:
+                            driver_zipfile.extractall(tmp_dir)
+                try:
+                    os.rename(tmp_dir, object_dir)
+                    logger.debug("Added {0} to the driver cache as {1}".format(filename, archive_hash))
+                except OSError:
+                    # Another installer added the same archive first.
+                    shutil.rmtree(tmp_dir)
+            self._save_cache_index(download_url, archive_hash)
+        with metrics.phase("link"):
+            self._link_tree(object_dir, extract_dir)
+        return extract_dir
+
+    def _can_stream_extract(self, version="latest", os_name=None, bitness=None, download_url=None):
+        """
+        Method for checking whether an archive can be extracted while it is downloaded.
+
+        :param version: String representing the version of the web driver binary to download.
+        :param os_name: Name of the OS to download the web driver binary for, as a str.
+        :param bitness: Bitness of the web driver binary to download, as a str e.g. "32", "64".
+        :param download_url: The download URL already resolved by the caller.  If not specified, it is resolved with
+                             get_download_url().
+        :returns: True if the archive is a .tar.gz that is not on the filesystem yet.
+        """
+        if download_url is None:
+            download_url = self._resolve_download_url(version, os_name=os_name, bitness=bitness)
+        filename = os.path.split(urlparse(download_url).path)[1]
+        if not filename.lower().endswith(".tar.gz"):
+            logger.debug("{0} is not a .tar.gz archive and is extracted after the download.".format(filename))
+            return False
+        return not os.path.isfile(os.path.join(self.get_download_path(version), filename))
+
+    def _download_and_extract(self, download_url, extract_dir, archive_filename=None, show_progress_bar=True):
+        """
+        Method for extracting a .tar.gz archive while it is downloaded, without reading it back from disk.
+
+        The archive is extracted into a temporary directory that replaces extract_dir once the whole stream was
+        read, so an interrupted transfer never leaves a partially extracted driver behind.
+
+        :param download_url: The source download URL for the web driver binary.
+        :param extract_dir: The directory the archive is extracted to.
+        :param archive_filename: The path + filename the archive is also written to, or None to not keep it.
+        :param show_progress_bar: Boolean (default=True) indicating if a progress bar should be shown in the console.
+        :returns: The SHA-256 hex digest of the archive.
+        """
+        data = self.session.get(download_url, stream=True)
+        if data.status_code != 200:
+            data.close()
+            filename = os.path.split(urlparse(download_url).path)[1]
+            error_message = "Error downloading file {0}, got status code: {1}".format(filename, data.status_code)
+            logger.error(error_message)
+            raise RuntimeError(error_message)
+        parent_dir = os.path.dirname(os.path.abspath(extract_dir))
+        if not os.path.isdir(parent_dir):
+            os.makedirs(parent_dir)
+        tmp_dir = tempfile.mkdtemp(dir=parent_dir, suffix=".tmp")
+        archive_fileobj = open(archive_filename + ".part", mode="wb") if archive_filename is not None else None
+        progress_bar = None
+        if show_progress_bar:
+            progress_bar = tqdm.tqdm(total=int(data.headers.get('Content-Length', 0)) or None, unit='B',
+                                     unit_scale=True)
+        logger.debug("Starting streamed download and extraction of {0} to {1}".format(download_url, extract_dir))
+        try:
+            reader = _HashingReader(data.raw, archive_fileobj, progress_bar, self._metrics())
+            with tarfile.open(fileobj=reader, mode="r|gz") as tar:
+                tar.extractall(tmp_dir)
+            # Drain the end-of-archive padding so the digest and the kept archive cover the whole file.
+            while reader.read(64 * 1024):
+                pass
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if archive_fileobj is not None:
+                archive_fileobj.close()
+                os.remove(archive_filename + ".part")
+            raise
+        finally:
+            data.close()
+            if progress_bar is not None:
+                progress_bar.close()
+        if archive_fileobj is not None:
+            archive_fileobj.close()
+            self._write_file_digest(archive_filename, reader.sha256.hexdigest())
+            os.replace(archive_filename + ".part", archive_filename)
+        if os.path.isdir(extract_dir):
+            shutil.rmtree(extract_dir)
+        os.rename(tmp_dir, extract_dir)
+        logger.debug("Finished streamed download and extraction of {0} to {1}".format(download_url, extract_dir))
+        return reader.sha256.hexdigest()